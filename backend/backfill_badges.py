@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Backfill badges after adding a badge rule or changing a threshold.
+
+Runs the compiled BADGE_RULES aggregation over every solution in a single
+pass and grants missing badges (plus their notifications) in batches of
+bulk writes. Safe to interrupt and re-run: badges are added with
+$addToSet and notifications have deterministic ids.
+
+Running API processes keep cached profiles for up to
+USER_CACHE_TTL_SECONDS, so new badges can take that long to show up.
+
+Usage:
+    python backfill_badges.py --dry-run
+    python backfill_badges.py --batch-size 2000 --badge quick_solver
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import server
+from script_db import add_database_args, connect
+from server import BADGE_RULES, BadgeType, award_badges, badge_candidates
+
+
+async def backfill(args):
+    client = connect(args)
+
+    rules = BADGE_RULES
+    if args.badge:
+        rules = [rule for rule in BADGE_RULES if rule["badge"].value in args.badge]
+
+    started = time.perf_counter()
+    awarded = Counter()
+    users = 0
+    batch = {}
+
+    async def flush():
+        if batch and not args.dry_run:
+            await award_badges(batch, notify=not args.no_notify)
+        batch.clear()
+
+    async for user_id, badges in badge_candidates(rules=rules):
+        batch[user_id] = badges
+        awarded.update(badges)
+        users += 1
+        if len(batch) >= args.batch_size:
+            await flush()
+            print(f"  {users} users updated ({time.perf_counter() - started:.1f}s)")
+    await flush()
+    client.close()
+
+    verb = "Would award" if args.dry_run else "Awarded"
+    print(f"{verb} {sum(awarded.values())} badges to {users} users in {time.perf_counter() - started:.1f}s:")
+    for badge, count in awarded.most_common():
+        print(f"  {badge}: {count}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Grant badges that existing users already qualify for")
+    parser.add_argument("--badge", action="append", choices=[badge.value for badge in BadgeType],
+                        help="Only evaluate this badge's rules (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Users per bulk write")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be awarded without writing")
+    parser.add_argument("--no-notify", action="store_true", help="Grant badges without notifications")
+    add_database_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(parse_args()))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Compute users.search_keys for accounts created before admin user search
+became accent-insensitive.
+
+Admin search only matches users through their search_keys (folded name
+and email prefixes), so users without keys are invisible to it until this
+has run. Pass --all after changing how keys are derived to recompute
+them for every user. Safe to interrupt and re-run.
+
+Usage:
+    python backfill_user_search.py
+    python backfill_user_search.py --all --batch-size 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+from pymongo import UpdateOne
+
+import server
+from script_db import add_database_args, connect
+from server import USER_SEARCH_INDEX, user_search_keys
+
+
+async def backfill(args):
+    client = connect(args)
+    started = time.perf_counter()
+
+    await server.db.users.create_index(USER_SEARCH_INDEX)
+    query = {} if args.all else {"search_keys": {"$exists": False}}
+    updated = 0
+    batch = []
+    async for user in server.db.users.find(query, {"_id": 1, "name": 1, "email": 1}):
+        batch.append(UpdateOne(
+            {"_id": user["_id"]}, {"$set": {"search_keys": user_search_keys(user["name"], user["email"])}}
+        ))
+        if len(batch) >= args.batch_size:
+            await server.db.users.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+            print(f"  {updated} users updated ({time.perf_counter() - started:.1f}s)")
+    if batch:
+        await server.db.users.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    client.close()
+    print(f"Computed search keys for {updated} users in {time.perf_counter() - started:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compute accent-insensitive search keys for existing users")
+    parser.add_argument("--all", action="store_true", help="Recompute keys for users that already have them")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Users per bulk write")
+    add_database_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(parse_args()))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-item cost of serializing large list responses.
+
+Compares the standard path (build Pydantic models, let FastAPI validate them
+again against response_model and encode with json) with the fast path used
+by the list endpoints (project_document + orjson).
+
+Usage:
+    python bench_serialization.py --items 1000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from server import (
+    ChallengeResponse,
+    SolutionResponse,
+    UserManagement,
+    fast_json_response,
+    project_document,
+)
+
+
+def challenge_documents(count: int):
+    now = datetime.utcnow()
+    return [{
+        "id": str(uuid.uuid4()),
+        "title": f"Desafio {i}",
+        "description": "Proponha uma solução inovadora para o campus. " * 5,
+        "category": "technology",
+        "difficulty": "intermediate",
+        "deadline": now + timedelta(days=i % 30),
+        "criteria": "Originalidade, viabilidade e impacto",
+        "points_reward": 100,
+        "status": "active",
+        "created_by": "admin",
+        "created_at": now,
+        "tags": ["ia", "sustentabilidade", "dados"],
+    } for i in range(count)]
+
+
+def solution_documents(count: int):
+    now = datetime.utcnow()
+    return [{
+        "id": str(uuid.uuid4()),
+        "challenge_id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "content": "Minha proposta detalhada. " * 20,
+        "files": [],
+        "file_names": [],
+        "submitted_at": now,
+        "score": 80 if i % 2 else None,
+        "feedback": "Bom trabalho" if i % 2 else None,
+        "evaluated_by": "admin" if i % 2 else None,
+        "evaluated_at": now if i % 2 else None,
+    } for i in range(count)]
+
+
+def user_documents(count: int):
+    now = datetime.utcnow()
+    return [{
+        "id": str(uuid.uuid4()),
+        "email": f"aluno{i}@pucrs.edu.br",
+        "name": f"Aluno {i}",
+        "role": "student",
+        "points": i,
+        "badges": ["first_submission"],
+        "created_at": now,
+        "is_active": True,
+        "last_login": now,
+    } for i in range(count)]
+
+
+CASES = {
+    "challenges": (ChallengeResponse, challenge_documents, {"user_submitted": False, "can_submit": True}),
+    "solutions": (SolutionResponse, solution_documents, {"challenge_title": "Desafio", "user_name": "Aluno"}),
+    "users": (UserManagement, user_documents, {}),
+}
+
+
+async def standard_path(model, field, documents, extra):
+    models = [model(**document, **extra) for document in documents]
+    content = await serialize_response(field=field, response_content=models)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(model, documents, extra):
+    items = [project_document(model, document, **extra) for document in documents]
+    return fast_json_response(items).body
+
+
+def measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    print(f"{'endpoint':<12}{'standard µs/item':>18}{'fast µs/item':>16}{'speedup':>10}")
+    for name, (model, factory, extra) in CASES.items():
+        documents = factory(args.items)
+        field = create_response_field(name=f"Response_{name}", type_=List[model])
+        standard = measure(
+            lambda: loop.run_until_complete(standard_path(model, field, documents, extra)), args.repeat
+        )
+        fast = measure(lambda: fast_path(model, documents, extra), args.repeat)
+        print(
+            f"{name:<12}{standard / args.items * 1e6:>18.2f}{fast / args.items * 1e6:>16.2f}"
+            f"{standard / fast:>9.1f}x"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
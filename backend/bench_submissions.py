@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: a deadline rush of concurrent solution submissions.
+
+Creates a scratch database with one challenge closing at the end of the
+window and one student per submission, then has every student submit
+through the ASGI app in-process, with start times skewed toward the
+deadline, while job workers drain the submissions' outbox as they would
+in a server process. A share of students double-submit (two concurrent
+requests), which must yield exactly one stored solution each. Reports
+throughput, latency percentiles and the stored solution count.
+
+Usage:
+    python bench_submissions.py --submissions 1000 --window 60
+    python bench_submissions.py --window 5 --duplicate-ratio 0.3 --keep
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import httpx
+
+import server
+from script_db import add_database_args, connect
+from server import (
+    Challenge,
+    ChallengeCategory,
+    DifficultyLevel,
+    User,
+    UserRole,
+    create_user_token,
+)
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def setup(submissions: int, window: float) -> tuple:
+    now = datetime.utcnow()
+    admin = User(email="admin@bench.pucrs.br", name="Admin", password_hash="-", role=UserRole.ADMIN).dict()
+    challenge = Challenge(
+        title="Desafio relâmpago",
+        description="Prazo encerrando",
+        category=ChallengeCategory.TECHNOLOGY,
+        difficulty=DifficultyLevel.BEGINNER,
+        # Some slack so requests still in flight at the end are not rejected as late
+        deadline=now + timedelta(seconds=window + 30),
+        criteria="Impacto",
+        points_reward=100,
+        created_by=admin["id"],
+    ).dict()
+    students = [
+        User(
+            email=f"aluno{i}@bench.pucrs.br", name=f"Aluno {i}", password_hash="-", role=UserRole.STUDENT
+        ).dict()
+        for i in range(submissions)
+    ]
+    await server.db.users.insert_many([admin] + students)
+    await server.db.challenges.insert_one(challenge)
+    await server.ensure_indexes()
+    await server.challenge_catalog.load()
+    return challenge, students
+
+
+async def rush(http: httpx.AsyncClient, challenge: dict, students: list, args, rng: random.Random):
+    latencies = []
+    statuses = Counter()
+    started = time.perf_counter()
+
+    async def post(headers, body):
+        sent = time.perf_counter()
+        response = await http.post("/api/solutions", json=body, headers=headers)
+        latencies.append(time.perf_counter() - sent)
+        statuses[response.status_code] += 1
+
+    async def student(user):
+        # Arrivals bunch up toward the end of the window
+        await asyncio.sleep(args.window * (1 - rng.random() ** 3))
+        headers = {"Authorization": f"Bearer {create_user_token(user)}"}
+        body = {"challenge_id": challenge["id"], "content": f"Solução de {user['name']}"}
+        copies = 2 if rng.random() < args.duplicate_ratio else 1
+        await asyncio.gather(*(post(headers, body) for _ in range(copies)))
+
+    await asyncio.gather(*(student(user) for user in students))
+    return latencies, statuses, time.perf_counter() - started
+
+
+async def bench(args):
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    client = connect(args, maxPoolSize=args.pool_size)
+    await client.drop_database(args.db_name)
+    rng = random.Random(args.seed)
+
+    challenge, students = await setup(args.submissions, args.window)
+    # ASGITransport does not run startup, so start the job workers that
+    # relay and process each submission's outbox here, as a server would
+    server.job_queue.start(args.job_workers)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        latencies, statuses, elapsed = await rush(http, challenge, students, args, rng)
+    server.job_queue.stop()
+
+    stored = await server.db.solutions.count_documents({"challenge_id": challenge["id"]})
+    if not args.keep:
+        await client.drop_database(args.db_name)
+    client.close()
+
+    requests = sum(statuses.values())
+    print(f"{requests} requests from {len(students)} students over {elapsed:.1f}s "
+          f"({requests / elapsed:.0f} req/s average)")
+    print("status codes: " + ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items())))
+    print(f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+          f"max {max(latencies) * 1000:.1f} ms")
+    verdict = "OK" if stored == len(students) else "MISMATCH"
+    print(f"stored solutions: {stored} (expected {len(students)}) {verdict}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark concurrent submissions right before a deadline")
+    parser.add_argument("--submissions", type=int, default=1000, help="Students submitting")
+    parser.add_argument("--window", type=float, default=60.0, help="Seconds before the deadline")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1,
+                        help="Share of students whose submit is sent twice concurrently")
+    parser.add_argument("--job-workers", type=int, default=server.JOB_WORKERS,
+                        help="In-process job workers running alongside the API (0 to measure the API alone)")
+    parser.add_argument("--pool-size", type=int, default=100, help="MongoDB connection pool size")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database afterwards")
+    add_database_args(parser, "_bench_submissions",
+                      db_name_help="Scratch database; it is dropped before and after the run")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(bench(parse_args()))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Remove duplicate submissions so the unique (challenge_id, user_id) index
+can be built.
+
+Concurrent submits used to be able to store two solutions for the same
+user and challenge. For each such pair this keeps one solution (an
+evaluated one if any, otherwise the earliest), moves the others to
+`archived_solutions`, releases their attachments and finally builds
+SUBMISSION_INDEX. Running API processes notice the index within
+SUBMISSION_INDEX_RETRY_SECONDS. Safe to re-run.
+
+Usage:
+    python dedup_solutions.py --dry-run
+    python dedup_solutions.py
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+import server
+from script_db import add_database_args, connect
+from server import (
+    SUBMISSION_INDEX,
+    attachment_ref_counts,
+    insert_ignoring_duplicates,
+    release_attachments,
+)
+
+
+def keep_first(solution: dict) -> tuple:
+    """Evaluated solutions first, then by submission time"""
+    return (solution.get("score") is None, solution["submitted_at"])
+
+
+async def dedup(args) -> int:
+    duplicates = server.db.solutions.aggregate([
+        {"$group": {"_id": {"challenge_id": "$challenge_id", "user_id": "$user_id"}, "ids": {"$push": "$_id"}}},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ], allowDiskUse=True)
+    archived = 0
+    async for group in duplicates:
+        solutions = sorted(
+            await server.db.solutions.find({"_id": {"$in": group["ids"]}}).to_list(None), key=keep_first
+        )
+        extra = solutions[1:]
+        archived += len(extra)
+        print(f"  {group['_id']['user_id']} / {group['_id']['challenge_id']}: "
+              f"keeping {solutions[0]['id']}, archiving {len(extra)}")
+        if args.dry_run:
+            continue
+        archived_at = datetime.utcnow()
+        await insert_ignoring_duplicates(server.db.archived_solutions, [
+            {**solution, "archived_at": archived_at, "archived_reason": "duplicate"} for solution in extra
+        ])
+        await server.db.solutions.delete_many({"_id": {"$in": [solution["_id"] for solution in extra]}})
+        await release_attachments(attachment_ref_counts(extra))
+    return archived
+
+
+async def main(args):
+    client = connect(args)
+    started = time.perf_counter()
+
+    archived = await dedup(args)
+    if not args.dry_run:
+        await server.db.solutions.create_index(SUBMISSION_INDEX, unique=True)
+    client.close()
+
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {archived} duplicate solutions in {time.perf_counter() - started:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Archive duplicate submissions and build the unique submission index")
+    parser.add_argument("--dry-run", action="store_true", help="Report duplicates without changing anything")
+    add_database_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
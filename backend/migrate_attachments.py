@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Move inline base64 solution files into the content-addressed attachment store.
+
+Solutions submitted before attachments were deduplicated hold a full
+base64 copy of every file. This rewrites them in batches to
+"sha256:<digest>" refs, storing each distinct file once. Safe to
+interrupt and re-run: solutions already holding refs are skipped. A crash
+between the two writes of a batch can leave a few attachments with a
+refcount that is too high; they are then simply never collected.
+
+Usage:
+    python migrate_attachments.py
+    python migrate_attachments.py --batch-size 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+import server
+from script_db import add_database_args, connect
+from server import ATTACHMENT_REF_PREFIX, store_attachments
+
+
+async def migrate_batch(solutions) -> int:
+    files = [ref for solution in solutions for ref in solution["files"]]
+    try:
+        refs = await store_attachments(files, None)
+    except HTTPException:
+        # One solution holds corrupt data; migrate the rest one by one
+        migrated = 0
+        if len(solutions) > 1:
+            for solution in solutions:
+                migrated += await migrate_batch([solution])
+        else:
+            print(f"  skipped solution {solutions[0]['id']}: invalid attachment data")
+        return migrated
+
+    operations = []
+    for solution in solutions:
+        count = len(solution["files"])
+        operations.append(UpdateOne({"_id": solution["_id"]}, {"$set": {"files": refs[:count]}}))
+        refs = refs[count:]
+    await server.db.solutions.bulk_write(operations, ordered=False)
+    return len(solutions)
+
+
+async def migrate(args):
+    client = connect(args)
+    started = time.perf_counter()
+
+    inline = {"files": {"$elemMatch": {"$not": {"$regex": f"^{ATTACHMENT_REF_PREFIX}"}}}}
+    migrated = 0
+    batch = []
+    async for solution in server.db.solutions.find(inline, {"_id": 1, "id": 1, "files": 1}):
+        batch.append(solution)
+        if len(batch) >= args.batch_size:
+            migrated += await migrate_batch(batch)
+            batch = []
+            print(f"  {migrated} solutions migrated ({time.perf_counter() - started:.1f}s)")
+    if batch:
+        migrated += await migrate_batch(batch)
+    stored = await server.db.attachments.count_documents({})
+    client.close()
+    print(f"Migrated {migrated} solutions into {stored} attachments in {time.perf_counter() - started:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplicate inline solution files into the attachment store")
+    parser.add_argument("--batch-size", type=int, default=500, help="Solutions per bulk write")
+    add_database_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate(parse_args()))
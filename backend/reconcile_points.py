@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Rebuild users.points and the leaderboard rollups from the points ledger.
+
+The ledger (points_ledger) is the source of truth; users.points and
+points_rollups are derived from it and updated incrementally on each
+evaluation. Run this to repair drift in a maintenance window with
+evaluations paused: values are overwritten from a ledger scan, so points
+awarded during the run can be lost until the next run. The script warns
+when that happened.
+
+Databases that predate the ledger must be migrated once with
+--opening-balances: every user's current points that the ledger does not
+explain are recorded as an "opening_balance" entry dated at the user's
+registration, so they count for all-time rankings but not for the
+current day, week or month.
+
+Usage:
+    python reconcile_points.py --opening-balances
+    python reconcile_points.py --batch-size 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+import server
+from script_db import add_database_args, connect
+from server import PointsEntry, reconcile_points
+
+
+async def record_opening_balances(batch_size: int) -> int:
+    ledger_totals = {
+        row["_id"]: row["points"]
+        async for row in server.db.points_ledger.aggregate([
+            {"$group": {"_id": "$user_id", "points": {"$sum": "$points"}}}
+        ], allowDiskUse=True)
+    }
+    recorded = 0
+    batch = []
+    async for user in server.db.users.find({}, {"_id": 0, "id": 1, "points": 1, "created_at": 1}):
+        difference = user.get("points", 0) - ledger_totals.get(user["id"], 0)
+        if difference:
+            batch.append(PointsEntry(
+                user_id=user["id"],
+                points=difference,
+                reason="opening_balance",
+                created_at=user["created_at"]
+            ).dict())
+        if len(batch) >= batch_size:
+            await server.db.points_ledger.insert_many(batch, ordered=False)
+            recorded += len(batch)
+            batch = []
+    if batch:
+        await server.db.points_ledger.insert_many(batch, ordered=False)
+        recorded += len(batch)
+    return recorded
+
+
+async def reconcile(args):
+    client = connect(args)
+    started = time.perf_counter()
+
+    if args.opening_balances:
+        recorded = await record_opening_balances(args.batch_size)
+        print(f"Recorded {recorded} opening balances")
+
+    result = await reconcile_points(args.batch_size)
+    client.close()
+    print(
+        f"Corrected points for {result['users_corrected']} users and rebuilt "
+        f"{result['rollups']} rollups in {time.perf_counter() - started:.1f}s"
+    )
+    if result["concurrent_entries"]:
+        print(f"Warning: {result['concurrent_entries']} ledger entries were recorded during the run; "
+              f"run again with evaluations paused")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild user points and leaderboard rollups from the ledger")
+    parser.add_argument("--opening-balances", action="store_true",
+                        help="First migrate points the ledger does not explain into opening-balance entries")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    add_database_args(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile(parse_args()))
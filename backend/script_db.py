@@ -0,0 +1,25 @@
+"""
+Database options and connection shared by the maintenance, seeding and
+benchmark scripts in this directory.
+"""
+
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import server
+
+
+def add_database_args(parser, db_name_suffix: str = "", db_name_help=None):
+    """Add --mongo-url and --db-name, defaulting to the server's settings"""
+    # server.py has already loaded backend/.env at import time
+    db_name = os.environ.get('DB_NAME')
+    parser.add_argument("--mongo-url", default=os.environ.get('MONGO_URL'))
+    parser.add_argument("--db-name", default=db_name and db_name + db_name_suffix, help=db_name_help)
+
+
+def connect(args, **client_options) -> AsyncIOMotorClient:
+    """Point server.db at the database the arguments name; returns the client to close"""
+    client = AsyncIOMotorClient(args.mongo_url, **client_options)
+    server.db = client[args.db_name]
+    return client
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for scale testing.
+
+Seeds users, challenges, solutions (with a configurable attachment size mix
+and share of attachments reusing an already stored file), evaluations
+(recorded in the points ledger and leaderboard rollups) and notifications at
+a chosen scale. Activity is skewed (a few users submit a lot, most submit
+little) and deadlines fall both in the past and in the future.
+
+Usage:
+    python seed_data.py --scale 100k --drop
+    python seed_data.py --solutions 250000 --attachments "0:0.6,20480:0.3,524288:0.1"
+    python seed_data.py --scale 1m --attachment-reuse 0.8
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import server
+from script_db import add_database_args, connect
+from server import (
+    ATTACHMENT_REF_PREFIX,
+    BadgeType,
+    ChallengeCategory,
+    ChallengeStatus,
+    DifficultyLevel,
+    PointsEntry,
+    UserRole,
+    hash_password,
+    rollup_increments,
+    rollup_key,
+    user_search_keys,
+)
+
+# Scale presets, keyed by number of solutions
+SCALES = {
+    "10k": {"users": 2000, "challenges": 200, "solutions": 10000},
+    "100k": {"users": 20000, "challenges": 1000, "solutions": 100000},
+    "1m": {"users": 100000, "challenges": 5000, "solutions": 1000000},
+}
+
+# Attachment size (bytes) -> probability
+DEFAULT_ATTACHMENT_MIX = "0:0.7,8192:0.2,262144:0.08,2097152:0.02"
+# Attachments are large, so they are written in smaller batches than the rest
+ATTACHMENT_BATCH_SIZE = 50
+
+SEED_PASSWORD = "SeedPass123!"
+
+FIRST_NAMES = ["Ana", "João", "Maria", "Pedro", "Lucas", "Júlia", "Gabriel", "Beatriz", "Rafael", "Camila",
+               "Mateus", "Larissa", "Felipe", "Fernanda", "Gustavo", "Isabela", "Bruno", "Letícia", "Thiago", "Mariana"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Pereira", "Costa", "Rodrigues", "Almeida", "Nascimento",
+              "Lima", "Araújo", "Fernandes", "Carvalho", "Gomes", "Martins", "Rocha", "Ribeiro", "Alves"]
+TOPICS = ["sustentabilidade", "IA", "saúde", "energia", "mobilidade", "educação", "resíduos", "telemedicina",
+          "IoT", "acessibilidade", "água", "startups", "dados", "robótica", "agricultura"]
+
+
+def parse_attachment_mix(spec: str):
+    """Parse 'size:prob,size:prob' into parallel lists of sizes and weights"""
+    sizes, weights = [], []
+    for part in spec.split(","):
+        size, prob = part.split(":")
+        sizes.append(int(size))
+        weights.append(float(prob))
+    return sizes, weights
+
+
+class PayloadPool:
+    """Distinct attachment payloads per size class, referenced by digest as the API stores them.
+    
+    Each attachment reuses an already generated payload of its size with
+    probability `reuse`, favouring older ones so refcounts have a long tail,
+    and is otherwise a new payload. Payload n of a size is a random base with
+    n stamped over its first bytes, so only digests and refcounts are kept
+    in memory until the attachments are written.
+    """
+
+    def __init__(self, sizes, reuse: float, rng: random.Random):
+        self.reuse = reuse
+        self.rng = rng
+        self.bases = {size: rng.randbytes(size) for size in sizes if size > 0}
+        self.digests = {size: [] for size in self.bases}
+        self.sources = {}
+        self.refcounts = {}
+
+    def payload(self, size: int, n: int) -> bytes:
+        return (n.to_bytes(8, "big") + self.bases[size][8:])[:size]
+
+    def take(self, size: int) -> str:
+        """Digest of the attachment one more solution of this size holds"""
+        digests = self.digests[size]
+        if digests and self.rng.random() < self.reuse:
+            digest = digests[int(len(digests) * self.rng.random() ** 2)]
+        else:
+            n = len(digests)
+            digest = hashlib.sha256(self.payload(size, n)).hexdigest()
+            digests.append(digest)
+            self.sources.setdefault(digest, (size, n))
+        self.refcounts[digest] = self.refcounts.get(digest, 0) + 1
+        return digest
+
+    def documents(self, now: datetime):
+        for digest, refcount in self.refcounts.items():
+            size, n = self.sources[digest]
+            yield {"_id": digest, "data": self.payload(size, n), "size": size, "refcount": refcount,
+                   "created_at": now}
+
+
+def skewed_counts(total: int, buckets: int, cap: int, rng: random.Random, alpha: float = 1.2):
+    """Split `total` across `buckets` following a Pareto distribution, capped per bucket"""
+    weights = [rng.paretovariate(alpha) for _ in range(buckets)]
+    scale = total / sum(weights)
+    counts = [min(cap, int(w * scale)) for w in weights]
+    # Hand out the remainder (rounding and capping losses) to random buckets with room left
+    remaining = total - sum(counts)
+    open_buckets = [i for i, c in enumerate(counts) if c < cap]
+    while remaining > 0 and open_buckets:
+        i = rng.choice(open_buckets)
+        counts[i] += 1
+        remaining -= 1
+        if counts[i] >= cap:
+            open_buckets.remove(i)
+    return counts
+
+
+class BatchWriter:
+    """Parallel batched insert_many writer backed by an asyncio queue"""
+
+    def __init__(self, db, batch_size: int, concurrency: int, batch_sizes=None):
+        self.db = db
+        self.batch_size = batch_size
+        # Per-collection overrides of batch_size
+        self.batch_sizes = batch_sizes or {}
+        self.queue = asyncio.Queue(maxsize=concurrency * 2)
+        self.buffers = {}
+        self.inserted = {}
+        self.error = None
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(concurrency)]
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            try:
+                if item is None:
+                    return
+                # After a failure, keep draining so the producer never blocks on put()
+                if self.error:
+                    continue
+                collection, docs = item
+                try:
+                    await self.db[collection].insert_many(docs, ordered=False)
+                except Exception as error:
+                    self.error = (collection, error)
+                    continue
+                self.inserted[collection] = self.inserted.get(collection, 0) + len(docs)
+            finally:
+                self.queue.task_done()
+
+    def _raise_on_error(self):
+        if self.error:
+            collection, error = self.error
+            raise RuntimeError(f"Writing {collection} failed") from error
+
+    async def add(self, collection: str, doc: dict):
+        self._raise_on_error()
+        buffer = self.buffers.setdefault(collection, [])
+        buffer.append(doc)
+        if len(buffer) >= self.batch_sizes.get(collection, self.batch_size):
+            self.buffers[collection] = []
+            await self.queue.put((collection, buffer))
+
+    async def close(self):
+        for collection, buffer in self.buffers.items():
+            if buffer:
+                await self.queue.put((collection, buffer))
+        self.buffers = {}
+        for _ in self.workers:
+            await self.queue.put(None)
+        await asyncio.gather(*self.workers)
+        self._raise_on_error()
+
+
+def make_user(index: int, role: UserRole, password_hash: str, now: datetime, rng: random.Random):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    created_at = now - timedelta(days=rng.uniform(1, 720))
+    email = f"{first.lower()}.{last.lower()}.{index}@seed.pucrs.br"
+    return {
+        "id": str(uuid.uuid4()),
+        "email": email,
+        "name": f"{first} {last}",
+        "search_keys": user_search_keys(f"{first} {last}", email),
+        "password_hash": password_hash,
+        "role": role.value,
+        "points": 0,
+        "badges": [],
+        "created_at": created_at,
+        "is_active": rng.random() > 0.02,
+        "last_login": created_at + timedelta(days=rng.uniform(0, (now - created_at).days or 1)),
+    }
+
+
+def make_challenge(admin_id: str, now: datetime, rng: random.Random):
+    # Roughly 60% of deadlines already passed, the rest spread over the next months
+    if rng.random() < 0.6:
+        deadline = now - timedelta(hours=rng.uniform(1, 24 * 300))
+        status = rng.choice([ChallengeStatus.CLOSED, ChallengeStatus.EVALUATION, ChallengeStatus.ACTIVE])
+    else:
+        deadline = now + timedelta(days=rng.uniform(0.5, 120))
+        status = ChallengeStatus.ACTIVE
+    created_at = min(deadline, now) - timedelta(days=rng.uniform(7, 60))
+    topic = rng.choice(TOPICS)
+    return {
+        "id": str(uuid.uuid4()),
+        "title": f"Desafio de {topic} #{rng.randint(1, 99999)}",
+        "description": f"Proponha uma solução inovadora envolvendo {topic} no campus da PUCRS.",
+        "category": rng.choice(list(ChallengeCategory)).value,
+        "difficulty": rng.choice(list(DifficultyLevel)).value,
+        "deadline": deadline,
+        "criteria": "Originalidade, viabilidade e impacto",
+        "points_reward": rng.choice([50, 100, 150, 200, 300]),
+        "status": status.value,
+        "created_by": admin_id,
+        "created_at": created_at,
+        "tags": rng.sample(TOPICS, 3),
+    }
+
+
+async def seed(args):
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    client = connect(args, maxPoolSize=max(10, args.concurrency * 2))
+    db = server.db
+
+    if args.drop:
+        for name in ("users", "challenges", "solutions", "notifications", "attachments", "points_ledger",
+                     "points_rollups", "jobs", "dead_jobs", "archived_solutions", "collection_versions"):
+            await db[name].drop()
+
+    sizes, weights = parse_attachment_mix(args.attachments)
+    payloads = PayloadPool(sizes, args.attachment_reuse, rng)
+    # bcrypt is deliberately slow; every seeded account shares one hash
+    password_hash = hash_password(SEED_PASSWORD)
+
+    writer = BatchWriter(db, args.batch_size, args.concurrency, {"attachments": ATTACHMENT_BATCH_SIZE})
+    started = time.perf_counter()
+
+    admin = make_user(0, UserRole.ADMIN, password_hash, now, rng)
+    admin["email"] = "admin@seed.pucrs.br"
+    admin["search_keys"] = user_search_keys(admin["name"], admin["email"])
+    admin["is_active"] = True
+    await writer.add("users", admin)
+
+    challenges = [make_challenge(admin["id"], now, rng) for _ in range(args.challenges)]
+    for challenge in challenges:
+        await writer.add("challenges", challenge)
+
+    per_user = skewed_counts(args.solutions, args.users, len(challenges), rng)
+    for index, solution_count in enumerate(per_user, start=1):
+        role = UserRole.PROFESSOR if rng.random() < 0.05 else UserRole.STUDENT
+        user = make_user(index, role, password_hash, now, rng)
+        badges = set()
+        ledger = []
+
+        for challenge in rng.sample(challenges, solution_count):
+            window_end = min(challenge["deadline"], now)
+            span = max((window_end - challenge["created_at"]).total_seconds(), 60)
+            submitted_at = challenge["created_at"] + timedelta(seconds=rng.uniform(0, span))
+            size = rng.choices(sizes, weights)[0]
+            files = []
+            if size:
+                files = [ATTACHMENT_REF_PREFIX + payloads.take(size)]
+            solution = {
+                "id": str(uuid.uuid4()),
+                "challenge_id": challenge["id"],
+                "user_id": user["id"],
+                "content": f"Solução proposta por {user['name']} para {challenge['title']}.",
+                "files": files,
+                "file_names": [f"anexo_{size}.bin"] if size else [],
+                "submitted_at": submitted_at,
+                "score": None,
+                "feedback": None,
+                "evaluated_by": None,
+                "evaluated_at": None,
+            }
+            if challenge["deadline"] < now and rng.random() < args.evaluated_ratio:
+                score = max(0, min(100, int(rng.gauss(70, 15))))
+                solution.update({
+                    "score": score,
+                    "feedback": "Boa proposta, com espaço para aprofundar a viabilidade.",
+                    "evaluated_by": admin["id"],
+                    "evaluated_at": submitted_at + timedelta(days=rng.uniform(1, 14)),
+                })
+                user["points"] += score
+                ledger.append(PointsEntry(
+                    user_id=user["id"],
+                    points=score,
+                    reason="evaluation",
+                    solution_id=solution["id"],
+                    challenge_id=challenge["id"],
+                    category=challenge["category"],
+                    created_at=solution["evaluated_at"]
+                ).dict())
+                await writer.add("notifications", {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user["id"],
+                    "title": "Solução Avaliada! 📝",
+                    "message": f"Sua solução foi avaliada e recebeu {score} pontos.",
+                    "type": "evaluation",
+                    "read": rng.random() < 0.7,
+                    "created_at": solution["evaluated_at"],
+                })
+            await writer.add("solutions", solution)
+
+        # Points are explained by the ledger, with the rollups the windowed boards read
+        for entry in ledger:
+            await writer.add("points_ledger", entry)
+        for key, points in rollup_increments(ledger).items():
+            window, bucket, category, user_id = key
+            await writer.add("points_rollups", {
+                "_id": rollup_key(*key), "window": window, "bucket": bucket, "category": category,
+                "user_id": user_id, "points": points
+            })
+
+        if solution_count:
+            badges.add(BadgeType.FIRST_SUBMISSION.value)
+        if user["points"] >= 500:
+            badges.add(BadgeType.TOP_PERFORMER.value)
+        user["badges"] = sorted(badges)
+
+        for _ in range(int(rng.expovariate(1 / args.notifications_per_user))):
+            await writer.add("notifications", {
+                "id": str(uuid.uuid4()),
+                "user_id": user["id"],
+                "title": "Novo Desafio Disponível! 🎯",
+                "message": "Um novo desafio foi criado. Participe e ganhe pontos!",
+                "type": "challenge",
+                "read": rng.random() < 0.5,
+                "created_at": now - timedelta(days=rng.uniform(0, 90)),
+            })
+
+        await writer.add("users", user)
+
+        if index % 10000 == 0:
+            print(f"  generated {index}/{args.users} users ({time.perf_counter() - started:.1f}s)")
+
+    for attachment in payloads.documents(now):
+        await writer.add("attachments", attachment)
+
+    await writer.close()
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    print(f"Seeded database '{args.db_name}' in {elapsed:.1f}s:")
+    for collection, count in sorted(writer.inserted.items()):
+        print(f"  {collection}: {count}")
+    print(f"Admin login: {admin['email']} / {SEED_PASSWORD}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed MongoDB with a synthetic PUCRS gamification dataset")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k", help="Preset size (number of solutions)")
+    parser.add_argument("--users", type=int, help="Override number of users")
+    parser.add_argument("--challenges", type=int, help="Override number of challenges")
+    parser.add_argument("--solutions", type=int, help="Override number of solutions")
+    parser.add_argument("--attachments", default=DEFAULT_ATTACHMENT_MIX,
+                        help="Attachment size mix as 'bytes:probability,...'")
+    parser.add_argument("--attachment-reuse", type=float, default=0.3,
+                        help="Share of attachments that reuse an already stored file of the same size")
+    parser.add_argument("--evaluated-ratio", type=float, default=0.6,
+                        help="Share of solutions on closed challenges that get evaluated")
+    parser.add_argument("--notifications-per-user", type=float, default=5.0,
+                        help="Mean number of extra notifications per user")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel insert_many workers")
+    parser.add_argument("--seed", type=int, default=2025, help="Random seed for reproducible datasets")
+    add_database_args(parser)
+    parser.add_argument("--drop", action="store_true", help="Drop seeded collections before inserting")
+    args = parser.parse_args(argv)
+
+    preset = SCALES[args.scale]
+    for key in ("users", "challenges", "solutions"):
+        if getattr(args, key) is None:
+            setattr(args, key, preset[key])
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(seed(parse_args()))
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Query, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -7,14 +8,26 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import bcrypt
 import jwt
 import base64
+import binascii
 from enum import Enum
 import re
+import asyncio
+import hashlib
+import heapq
+import bisect
+import json
+import functools
+import time
+import unicodedata
+from collections import OrderedDict
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -34,6 +47,78 @@ api_router = APIRouter(prefix="/api")
 SECRET_KEY = "pucrs_gamification_secret_key_2025"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 720
+AUTH_EPOCH_REFRESH_SECONDS = 60
+
+# Shared ETag version counters; bounds how long a write made by another
+# process can go unnoticed by this one's conditional responses
+VERSION_REFRESH_SECONDS = 5
+
+# User profile cache
+USER_CACHE_MAX_SIZE = 10000
+USER_CACHE_TTL_SECONDS = 300
+
+# Search results: normalized query -> ranked challenge ids
+SEARCH_CACHE_MAX_SIZE = 1000
+SEARCH_RESULTS_MAX = 50
+USER_SEARCH_RESULTS_MAX = 20
+
+# Write-behind buffer for last_login updates
+LAST_LOGIN_FLUSH_SECONDS = 5
+LAST_LOGIN_BATCH_SIZE = 500
+
+# Challenge deadline scheduler
+CHALLENGE_REMINDER_LEAD = timedelta(hours=24)
+# Failed events are retried with exponential backoff, up to the cap
+SCHEDULER_RETRY_BASE = timedelta(seconds=5)
+SCHEDULER_RETRY_MAX = timedelta(minutes=5)
+NOTIFICATION_BATCH_SIZE = 1000
+
+# HTTP caching
+LEADERBOARD_CACHE_SECONDS = 30
+
+# Evaluation work queue: how long a grader holds claimed solutions
+EVALUATION_LEASE = timedelta(minutes=30)
+EVALUATION_CLAIM_MAX = 20
+
+# Content-addressed attachments: unreferenced ones are kept for a grace
+# period (so a concurrent upload can revive them) before the sweep
+ATTACHMENT_GC_SECONDS = 3600
+ATTACHMENT_GC_GRACE = timedelta(hours=1)
+
+# Challenge deletion: documents archived or deleted per cascade batch
+CASCADE_BATCH_SIZE = 500
+
+# Per-challenge analytics cache; the TTL bounds staleness from writes in other processes
+ANALYTICS_CACHE_SECONDS = 60
+SCORE_HISTOGRAM_WIDTH = 10
+SCORE_HISTOGRAM_MAX = 100
+
+# Leaderboard neighborhood queries
+LEADERBOARD_NEIGHBORS_MAX = 25
+
+# Challenge catalog snapshot
+CATALOG_REFRESH_SECONDS = 60
+
+# Single-flight result reuse window for hot read queries
+HOT_QUERY_TTL_SECONDS = 1.0
+
+# Background job queue. With JOB_WORKERS=0 this process only enqueues;
+# another process with workers runs the jobs.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_SECONDS = 2
+JOB_LEASE_SECONDS = 60
+# A running job's lease is pushed out this often, so only jobs whose
+# worker stopped are ever claimed again
+JOB_LEASE_RENEW_SECONDS = JOB_LEASE_SECONDS / 3
+JOB_POLL_SECONDS = 5
+# Done jobs are kept this long so a re-relay of the same key stays a
+# no-op; the relay re-delivers within seconds, this is just generous
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+# POST /api/batch limits
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "25"))
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "5"))
 
 # Security
 security = HTTPBearer()
@@ -56,6 +141,12 @@ class DifficultyLevel(str, Enum):
     INTERMEDIATE = "intermediate"
     ADVANCED = "advanced"
 
+class LeaderboardWindow(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    ALL = "all"
+
 class ChallengeStatus(str, Enum):
     ACTIVE = "active"
     CLOSED = "closed"
@@ -84,6 +175,27 @@ class User(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
     last_login: Optional[datetime] = None
+    auth_epoch: int = 0  # bumped to revoke every token issued before
+
+class CurrentUser:
+    """Authenticated principal used on the auth path.
+    
+    Built from token claims on every request, so it is a plain slotted
+    object rather than a Pydantic model: no validation and no profile
+    fields. Handlers that need profile data load it explicitly.
+    """
+    __slots__ = ("id", "role")
+    
+    def __init__(self, id: str, role: UserRole):
+        self.id = id
+        self.role = role
+    
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRole.ADMIN
+    
+    def __repr__(self):
+        return f"CurrentUser(id={self.id!r}, role={self.role.value!r})"
 
 class UserCreate(BaseModel):
     email: str
@@ -171,7 +283,7 @@ class Solution(BaseModel):
     challenge_id: str
     user_id: str
     content: str
-    files: List[str] = []  # base64 encoded files
+    files: List[str] = []  # attachment refs ("sha256:<digest>"); older solutions hold base64 inline
     file_names: List[str] = []  # original file names
     submitted_at: datetime = Field(default_factory=datetime.utcnow)
     score: Optional[int] = None
@@ -217,6 +329,28 @@ class LeaderboardEntry(BaseModel):
     badges: List[str]
     rank: int
 
+class LeaderboardPosition(BaseModel):
+    rank: int
+    entries: List[LeaderboardEntry]  # the user plus up to k neighbors each side
+
+class ScoreBucket(BaseModel):
+    min_score: int
+    max_score: int  # inclusive
+    count: int
+
+class ChallengeAnalytics(BaseModel):
+    challenge_id: str
+    title: str
+    status: ChallengeStatus
+    submissions: int
+    evaluated: int
+    pending: int
+    evaluation_progress: float  # evaluated / submissions, 0 when nothing was submitted
+    mean_score: Optional[float] = None
+    median_score: Optional[float] = None
+    percentiles: Dict[str, float] = {}
+    histogram: List[ScoreBucket]
+
 class SearchResult(BaseModel):
     challenges: List[ChallengeResponse] = []
     users: List[UserProfile] = []
@@ -230,6 +364,7 @@ class Notification(BaseModel):
     type: str  # "evaluation", "badge", "challenge", "system"
     read: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    challenge_id: Optional[str] = None  # lets a challenge's deletion cascade to it
 
 class NotificationResponse(BaseModel):
     id: str
@@ -239,7 +374,128 @@ class NotificationResponse(BaseModel):
     read: bool
     created_at: datetime
 
+class BatchItem(BaseModel):
+    method: str
+    path: str  # e.g. "/api/notifications?fields=title"
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+class BatchItemResult(BaseModel):
+    status: int
+    body: Any = None
+
+class DashboardResponse(BaseModel):
+    profile: UserProfile
+    rank: int
+    unread_notifications: int
+    challenges: List[ChallengeResponse]
+    my_solutions: List[SolutionResponse]
+    notifications: List[NotificationResponse]
+    leaderboard: List[LeaderboardEntry]
+
 # Helper Functions
+@functools.lru_cache(maxsize=None)
+def response_fields(model) -> tuple:
+    """(name, required, default) for each field of a response model"""
+    fields = []
+    for name, field in model.model_fields.items():
+        required = field.is_required()
+        default = None if required else field.get_default(call_default_factory=True)
+        fields.append((name, required, default))
+    return tuple(fields)
+
+def project_document(model, document: dict, fields: Optional[tuple] = None, **overrides) -> dict:
+    """Shape a trusted database document like `model` without validating it,
+    optionally keeping only the `fields` selected with ?fields="""
+    item = {}
+    for name, required, default in response_fields(model):
+        if fields is not None and name not in fields:
+            continue
+        if name in overrides:
+            item[name] = overrides[name]
+        elif required:
+            item[name] = document[name]
+        else:
+            item[name] = document.get(name, default)
+    return item
+
+# Allow-lists for ?fields= on list endpoints: resource -> response model
+SPARSE_FIELDSETS = {
+    "challenges": ChallengeResponse,
+    "solutions": SolutionResponse,
+    "notifications": NotificationResponse,
+    "users": UserManagement
+}
+
+def parse_fields(resource: str, fields: Optional[str]) -> Optional[tuple]:
+    """Validate a comma-separated ?fields= value against the resource's allow-list.
+    Returns None when no selection was made; `id` is always included."""
+    if fields is None:
+        return None
+    allowed = SPARSE_FIELDSETS[resource].model_fields
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields for {resource}: {', '.join(unknown)}"
+        )
+    return tuple(dict.fromkeys(["id"] + requested))
+
+def field_projection(fields: Optional[tuple], *dependencies: str) -> Optional[dict]:
+    """MongoDB projection for the selected fields plus those needed to compute others"""
+    if fields is None:
+        return None
+    return {"_id": 0, **{field: 1 for field in fields + dependencies}}
+
+def selected(fields: Optional[tuple], field: str) -> bool:
+    return fields is None or field in fields
+
+FIELDS_QUERY = Query(None, description="Comma-separated list of fields to return")
+
+def fast_json_response(content, response: Optional[Response] = None) -> ORJSONResponse:
+    """Serialize with orjson, skipping FastAPI's second response_model pass.
+    
+    Meant for large lists built with project_document from database
+    documents this server wrote itself. Headers already set on the injected
+    `response` (ETag, Cache-Control) are carried over.
+    """
+    headers = None
+    if response is not None:
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key not in ("content-length", "content-type")
+        }
+    return ORJSONResponse(content, headers=headers)
+
+def fold_text(value: str) -> str:
+    """Casefold and strip accents, so "João" and "joao" compare equal"""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+# Admin user search matches query words against prefixes of `search_keys`
+# (folded name words, the folded email and the words of its local part),
+# which every user write keeps in sync and USER_SEARCH_INDEX covers.
+USER_SEARCH_INDEX = [("search_keys", 1)]
+USER_PRIVATE_FIELDS = {"_id": 0, "password_hash": 0, "search_keys": 0}
+
+def user_search_keys(name: str, email: str) -> List[str]:
+    email = fold_text(email)
+    keys = set(fold_text(name).split())
+    keys.add(email)
+    keys.update(word for word in re.split(r"[._+\-]", email.split("@")[0]) if word)
+    return sorted(keys)
+
+def user_search_filter(q: str) -> Optional[dict]:
+    """Every word of the query must prefix some search key; anchored
+    regexes on an indexed field are index range scans"""
+    words = fold_text(q).split()
+    if not words:
+        return None
+    return {"$and": [{"search_keys": {"$regex": "^" + re.escape(word)}} for word in words]}
+
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
@@ -256,117 +512,717 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def create_user_token(user: dict) -> str:
+    """Issue an access token carrying the claims get_current_user validates"""
+    role = user["role"]
+    return create_access_token(
+        data={
+            "sub": user["id"],
+            "role": role.value if isinstance(role, UserRole) else role,
+            "epoch": user.get("auth_epoch", 0)
+        },
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+# Revocation epochs: user id -> current auth epoch. Only accounts whose
+# epoch was ever bumped are listed; everyone else is implicitly at 0.
+auth_epochs: Dict[str, int] = {}
+
+async def load_auth_epochs():
+    """Merge the revocation epochs stored in the database into the map.
+    
+    Epochs only grow, so keeping the larger value means a reload whose
+    query started before a local revocation cannot undo it.
+    """
+    users = await db.users.find(
+        {"auth_epoch": {"$gt": 0}},
+        {"id": 1, "auth_epoch": 1}
+    ).to_list(None)
+    for user in users:
+        if user["auth_epoch"] > auth_epochs.get(user["id"], 0):
+            auth_epochs[user["id"]] = user["auth_epoch"]
+
+async def run_periodically(interval: float, refresh, description: str):
+    """Call `refresh` every `interval` seconds, logging failures"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh()
+        except Exception:
+            logger.exception("Failed to refresh %s", description)
+
+async def update_user_and_revoke_tokens(user_id: str, update: dict) -> Optional[dict]:
+    """Apply an update to a user and invalidate every token issued before it"""
+    update.setdefault("$inc", {})["auth_epoch"] = 1
+    user = await db.users.find_one_and_update(
+        {"id": user_id},
+        update,
+        return_document=ReturnDocument.AFTER
+    )
+    user_cache.invalidate(user_id)
+    await collection_versions.bump("users")
+    if user:
+        auth_epochs[user_id] = max(auth_epochs.get(user_id, 0), user["auth_epoch"])
+    return user
+
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    # Sub-requests dispatched by /batch reuse the principal it authenticated
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    
     try:
         token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
-        if user_id is None:
+        role: str = payload.get("role")
+        epoch: int = payload.get("epoch")
+        if user_id is None or role is None or epoch is None:
             raise HTTPException(status_code=401, detail="Invalid token")
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user_data = await db.users.find_one({"id": user_id})
-    if user_data is None:
-        raise HTTPException(status_code=401, detail="User not found")
+    # Tokens issued before the account's latest epoch bump are revoked
+    if epoch < auth_epochs.get(user_id, 0):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    
+    try:
+        role = UserRole(role)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
     
-    return User(**user_data)
+    return CurrentUser(user_id, role)
 
-async def get_admin_user(current_user: User = Depends(get_current_user)):
-    if current_user.role != UserRole.ADMIN:
+async def get_admin_user(current_user: CurrentUser = Depends(get_current_user)):
+    if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
-async def check_and_award_badges(user_id: str):
-    """Check and award badges based on user achievements"""
-    user = await db.users.find_one({"id": user_id})
-    if not user:
-        return
+class CollectionVersions:
+    """Per-collection version counters used to build strong ETags.
+    
+    Every handler that writes to a collection bumps its version, so a
+    response's ETag changes whenever any data it was built from may have
+    changed. Counters are shared through the `collection_versions`
+    collection: a process sees its own bumps immediately and bumps made by
+    other processes (API replicas, job workers) after at most
+    VERSION_REFRESH_SECONDS.
+    """
+    
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+    
+    def _merge(self, collection: str, version: int):
+        # Versions only move forward, so an older read never undoes a bump
+        if version > self._versions.get(collection, 0):
+            self._versions[collection] = version
+    
+    async def bump(self, *collections: str):
+        for collection in collections:
+            counter = await db.collection_versions.find_one_and_update(
+                {"_id": collection},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            self._merge(collection, counter["version"])
     
-    current_badges = set(user.get("badges", []))
-    new_badges = []
-    
-    # Get user's solutions
-    solutions = await db.solutions.find({"user_id": user_id}).to_list(1000)
-    evaluated_solutions = [s for s in solutions if s.get("score") is not None]
-    
-    # First submission badge
-    if len(solutions) >= 1 and BadgeType.FIRST_SUBMISSION not in current_badges:
-        new_badges.append(BadgeType.FIRST_SUBMISSION)
-    
-    # Expert solver badge (5+ evaluated solutions)
-    if len(evaluated_solutions) >= 5 and BadgeType.EXPERT_SOLVER not in current_badges:
-        new_badges.append(BadgeType.EXPERT_SOLVER)
-    
-    # Top performer badge (500+ points)
-    if user.get("points", 0) >= 500 and BadgeType.TOP_PERFORMER not in current_badges:
-        new_badges.append(BadgeType.TOP_PERFORMER)
-    
-    # Category-specific badges
-    category_solutions = {}
-    for solution in evaluated_solutions:
-        if solution.get("score", 0) >= 80:  # High-scoring solutions
-            challenge = await db.challenges.find_one({"id": solution["challenge_id"]})
-            if challenge:
-                category = challenge.get("category")
-                category_solutions[category] = category_solutions.get(category, 0) + 1
-    
-    # Award category badges (3+ high-scoring solutions in category)
-    category_badges = {
-        "sustainability": BadgeType.SUSTAINABILITY_CHAMPION,
-        "technology": BadgeType.TECHNOLOGY_PIONEER,
-        "health": BadgeType.HEALTH_ADVOCATE,
-        "education": BadgeType.EDUCATION_INNOVATOR
-    }
+    async def load(self):
+        """Pick up bumps made by other processes"""
+        async for counter in db.collection_versions.find():
+            self._merge(counter["_id"], counter["version"])
     
-    for category, count in category_solutions.items():
-        if count >= 3:
-            badge = category_badges.get(category)
-            if badge and badge not in current_badges:
-                new_badges.append(badge)
+    def clear(self):
+        self._versions.clear()
     
-    # Quick solver badge (submitted within 24 hours of challenge creation)
-    quick_solutions = 0
-    for solution in solutions:
-        challenge = await db.challenges.find_one({"id": solution["challenge_id"]})
-        if challenge:
-            time_diff = solution["submitted_at"] - challenge["created_at"]
-            if time_diff.total_seconds() <= 24 * 3600:  # 24 hours
-                quick_solutions += 1
-    
-    if quick_solutions >= 3 and BadgeType.QUICK_SOLVER not in current_badges:
-        new_badges.append(BadgeType.QUICK_SOLVER)
-    
-    # Update user badges if new ones were earned
-    if new_badges:
-        all_badges = list(current_badges) + new_badges
-        await db.users.update_one(
-            {"id": user_id},
-            {"$set": {"badges": all_badges}}
+    def etag(self, collections: List[str], *parts) -> str:
+        key = "|".join(
+            [f"{collection}:{self._versions.get(collection, 0)}" for collection in collections]
+            + [str(part) for part in parts]
         )
+        return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '"'
+
+collection_versions = CollectionVersions()
+
+def conditional_response(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """Return a 304 response if the client already has this version, otherwise
+    attach the validators to the outgoing response and return None"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match uses weak comparison, so a W/ prefix is ignored
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        candidates = [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+class SingleFlight:
+    """Coalesces concurrent identical reads into one database call.
+    
+    Callers passing the same key while a call is in flight await that call
+    instead of issuing their own. With a ttl, the result is also reused for
+    a short while after it completes, which absorbs thundering herds when
+    HTTP caches expire. Keys should include the collection versions the
+    query depends on so a write never serves an outdated result.
+    Results are shared between callers and must not be mutated.
+    """
+    
+    def __init__(self):
+        self.executions = 0
+        self.shared = 0
+        self.reused = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._results: Dict[str, tuple] = {}
+    
+    async def do(self, key: str, fn, ttl: float = 0):
+        entry = self._results.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.reused += 1
+                return entry[1]
+            del self._results[key]
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.executions += 1
+            # Run as its own task so a cancelled caller does not cancel it for everyone
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._complete(key, done, ttl))
+        return await asyncio.shield(task)
+    
+    def _complete(self, key: str, task: asyncio.Task, ttl: float):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if ttl > 0:
+            self._results[key] = (time.monotonic() + ttl, task.result())
+            if len(self._results) > 1000:
+                now = time.monotonic()
+                self._results = {k: v for k, v in self._results.items() if v[0] > now}
+    
+    def clear(self):
+        self._results.clear()
+        self.executions = 0
+        self.shared = 0
+        self.reused = 0
+    
+    def stats(self) -> dict:
+        return {
+            "executions": self.executions,
+            "shared_in_flight": self.shared,
+            "reused_results": self.reused,
+            "in_flight": len(self._inflight)
+        }
+
+hot_reads = SingleFlight()
+
+def query_key(collection: str, *parts, versions: List[str] = ()) -> str:
+    """Normalized single-flight key for a query and the collection versions it reads"""
+    return json.dumps(
+        [collection, [collection_versions.etag(versions)] if versions else [], list(parts)],
+        sort_keys=True,
+        default=str
+    )
+
+class UserProfileCache:
+    """Bounded LRU cache of user documents (without password hash) keyed by id.
+    
+    Every write to `users` must call invalidate() for the affected id.
+    Entries also expire after `ttl` seconds, which bounds staleness from
+    writes made by other server processes.
+    """
+    
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # id -> token of the newest in-flight load; invalidate() drops it so a
+        # load that raced with a write does not repopulate stale data
+        self._loading: Dict[str, object] = {}
+    
+    def _lookup(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return user
+    
+    def _store(self, user: dict, token: object):
+        user_id = user["id"]
+        if self._loading.get(user_id) is not token:
+            return
+        del self._loading[user_id]
+        self._entries[user_id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    async def get(self, user_id: str) -> Optional[dict]:
+        user = self._lookup(user_id)
+        if user is not None:
+            self.hits += 1
+            return user
+        
+        self.misses += 1
+        token = self._loading[user_id] = object()
+        user = await db.users.find_one({"id": user_id}, USER_PRIVATE_FIELDS)
+        if user:
+            self._store(user, token)
+        elif self._loading.get(user_id) is token:
+            del self._loading[user_id]
+        return user
+    
+    async def get_many(self, user_ids) -> Dict[str, dict]:
+        """Resolve several users, fetching all misses with one query"""
+        found = {}
+        missing = []
+        for user_id in set(user_ids):
+            user = self._lookup(user_id)
+            if user is not None:
+                found[user_id] = user
+            else:
+                missing.append(user_id)
         
-        # Create notifications for new badges
-        for badge in new_badges:
-            badge_names = {
-                BadgeType.FIRST_SUBMISSION: "Primeira Submissão",
-                BadgeType.EXPERT_SOLVER: "Solucionador Expert",
-                BadgeType.TOP_PERFORMER: "Alto Desempenho",
-                BadgeType.SUSTAINABILITY_CHAMPION: "Campeão da Sustentabilidade",
-                BadgeType.TECHNOLOGY_PIONEER: "Pioneiro em Tecnologia",
-                BadgeType.HEALTH_ADVOCATE: "Defensor da Saúde",
-                BadgeType.EDUCATION_INNOVATOR: "Inovador em Educação",
-                BadgeType.QUICK_SOLVER: "Solucionador Rápido"
+        self.hits += len(found)
+        self.misses += len(missing)
+        if missing:
+            tokens = {user_id: object() for user_id in missing}
+            self._loading.update(tokens)
+            users = await db.users.find(
+                {"id": {"$in": missing}},
+                USER_PRIVATE_FIELDS
+            ).to_list(None)
+            for user in users:
+                self._store(user, tokens[user["id"]])
+                found[user["id"]] = user
+            for user_id, token in tokens.items():
+                if self._loading.get(user_id) is token:
+                    del self._loading[user_id]
+        return found
+    
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+        self._loading.pop(user_id, None)
+    
+    def clear(self):
+        self._entries.clear()
+        self._loading.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+user_cache = UserProfileCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS)
+
+class LastLoginBuffer:
+    """Buffers last_login timestamps and writes them with one bulk_write.
+    
+    Flushes every LAST_LOGIN_FLUSH_SECONDS, as soon as LAST_LOGIN_BATCH_SIZE
+    users are pending, and on shutdown. Only the newest timestamp per user
+    is kept, and $max keeps flushes from moving last_login backwards.
+    """
+    
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending: Dict[str, datetime] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Referenced so the event loop cannot garbage-collect it mid-flush
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    def record(self, user_id: str, timestamp: datetime):
+        self.pending[user_id] = timestamp
+        flushing = self._flush_lock.locked() or (self._flush_task is not None and not self._flush_task.done())
+        if len(self.pending) >= self.batch_size and not flushing:
+            self._flush_task = asyncio.create_task(self.flush())
+    
+    def latest(self, user_id: str) -> Optional[datetime]:
+        """Timestamp recorded for a user but not yet written, if any"""
+        return self.pending.get(user_id)
+    
+    async def flush(self):
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+            try:
+                await db.users.bulk_write(
+                    [
+                        UpdateOne({"id": user_id}, {"$max": {"last_login": timestamp}})
+                        for user_id, timestamp in batch.items()
+                    ],
+                    ordered=False
+                )
+            except Exception:
+                logger.exception("Failed to flush %d last_login updates", len(batch))
+                # Keep the batch for the next flush, without overwriting newer logins
+                for user_id, timestamp in batch.items():
+                    if user_id not in self.pending:
+                        self.pending[user_id] = timestamp
+                return
+            for user_id in batch:
+                user_cache.invalidate(user_id)
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+    
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+last_login_buffer = LastLoginBuffer(LAST_LOGIN_BATCH_SIZE, LAST_LOGIN_FLUSH_SECONDS)
+
+# Declarative badge rules. Each rule awards `badge` once the user's
+# `metric` reaches `threshold`; "high_scores" counts evaluated solutions
+# scoring at least BADGE_HIGH_SCORE in `category`. compile_badge_pipeline()
+# turns the list into one aggregation, so adding or retuning a rule only
+# means editing this list (and running backfill_badges.py).
+BADGE_HIGH_SCORE = 80
+BADGE_QUICK_WINDOW = timedelta(hours=24)
+BADGE_RULES = [
+    {"badge": BadgeType.FIRST_SUBMISSION, "metric": "submissions", "threshold": 1},
+    {"badge": BadgeType.EXPERT_SOLVER, "metric": "evaluated", "threshold": 5},
+    {"badge": BadgeType.TOP_PERFORMER, "metric": "points", "threshold": 500},
+    {"badge": BadgeType.SUSTAINABILITY_CHAMPION, "metric": "high_scores", "category": "sustainability", "threshold": 3},
+    {"badge": BadgeType.TECHNOLOGY_PIONEER, "metric": "high_scores", "category": "technology", "threshold": 3},
+    {"badge": BadgeType.HEALTH_ADVOCATE, "metric": "high_scores", "category": "health", "threshold": 3},
+    {"badge": BadgeType.EDUCATION_INNOVATOR, "metric": "high_scores", "category": "education", "threshold": 3},
+    {"badge": BadgeType.QUICK_SOLVER, "metric": "quick_submissions", "threshold": 3}
+]
+
+BADGE_NAMES = {
+    BadgeType.FIRST_SUBMISSION: "Primeira Submissão",
+    BadgeType.EXPERT_SOLVER: "Solucionador Expert",
+    BadgeType.TOP_PERFORMER: "Alto Desempenho",
+    BadgeType.SUSTAINABILITY_CHAMPION: "Campeão da Sustentabilidade",
+    BadgeType.TECHNOLOGY_PIONEER: "Pioneiro em Tecnologia",
+    BadgeType.HEALTH_ADVOCATE: "Defensor da Saúde",
+    BadgeType.EDUCATION_INNOVATOR: "Inovador em Educação",
+    BadgeType.QUICK_SOLVER: "Solucionador Rápido"
+}
+
+def badge_metric(rule: dict):
+    """($group accumulator, field name) computing a rule's per-user metric
+    from solution documents joined with their challenge"""
+    metric = rule["metric"]
+    if metric == "submissions":
+        return {"$sum": 1}, metric
+    if metric == "evaluated":
+        return {"$sum": {"$cond": [{"$gt": ["$score", None]}, 1, 0]}}, metric
+    if metric == "high_scores":
+        condition = {"$and": [
+            {"$gte": ["$score", BADGE_HIGH_SCORE]},
+            {"$eq": ["$challenge.category", rule["category"]]}
+        ]}
+        return {"$sum": {"$cond": [condition, 1, 0]}}, f"high_scores_{rule['category']}"
+    if metric == "quick_submissions":
+        condition = {"$and": [
+            {"$gt": ["$challenge.created_at", None]},
+            {"$lte": [
+                {"$subtract": ["$submitted_at", "$challenge.created_at"]},
+                int(BADGE_QUICK_WINDOW.total_seconds() * 1000)
+            ]}
+        ]}
+        return {"$sum": {"$cond": [condition, 1, 0]}}, metric
+    if metric == "points":
+        return None, "$user.points"
+    raise ValueError(f"Unknown badge metric: {metric}")
+
+def compile_badge_pipeline(match: Optional[dict] = None, rules: Optional[List[dict]] = None) -> List[dict]:
+    """One aggregation over solutions that yields, per user, the badges
+    they qualify for (`earned`) next to the badges they hold (`badges`)"""
+    rules = BADGE_RULES if rules is None else rules
+    accumulators = {}
+    earned = []
+    for rule in rules:
+        accumulator, field = badge_metric(rule)
+        if accumulator is not None:
+            accumulators[field] = accumulator
+            field = f"${field}"
+        earned.append({"$cond": [{"$gte": [field, rule["threshold"]]}, [rule["badge"].value], []]})
+    return [
+        {"$match": match or {}},
+        {"$lookup": {"from": "challenges", "localField": "challenge_id", "foreignField": "id", "as": "challenge"}},
+        {"$unwind": {"path": "$challenge", "preserveNullAndEmptyArrays": True}},
+        {"$group": {"_id": "$user_id", **accumulators}},
+        {"$lookup": {"from": "users", "localField": "_id", "foreignField": "id", "as": "user"}},
+        {"$unwind": "$user"},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "earned": {"$concatArrays": earned},
+            "badges": "$user.badges"
+        }}
+    ]
+
+async def badge_candidates(match: Optional[dict] = None, rules: Optional[List[dict]] = None):
+    """Yield (user_id, badges not yet held) for every user who qualifies for a new one"""
+    cursor = db.solutions.aggregate(compile_badge_pipeline(match, rules), allowDiskUse=True)
+    async for row in cursor:
+        held = set(row.get("badges") or [])
+        new_badges = [badge for badge in row["earned"] if badge not in held]
+        if new_badges:
+            yield row["user_id"], new_badges
+
+async def award_badges(awards: Dict[str, List[str]], notify: bool = True):
+    """Grant badges to many users with one bulk write.
+    
+    Notifications get deterministic ids and are written first, so
+    re-running an interrupted award neither loses nor duplicates them.
+    $addToSet keeps badges written concurrently by another award.
+    """
+    if not awards:
+        return
+    if notify:
+        await insert_ignoring_duplicates(db.notifications, [
+            {
+                "_id": f"badge:{user_id}:{badge}",
+                **Notification(
+                    user_id=user_id,
+                    title="Nova Badge Conquistada! 🏆",
+                    message=f"Parabéns! Você conquistou a badge '{BADGE_NAMES.get(badge, badge)}'",
+                    type="badge"
+                ).dict()
             }
-            
-            notification = Notification(
-                user_id=user_id,
-                title=f"Nova Badge Conquistada! 🏆",
-                message=f"Parabéns! Você conquistou a badge '{badge_names.get(badge, badge)}'",
-                type="badge"
-            )
-            await db.notifications.insert_one(notification.dict())
+            for user_id, badges in awards.items()
+            for badge in badges
+        ])
+        await collection_versions.bump("notifications")
+    await db.users.bulk_write([
+        UpdateOne({"id": user_id}, {"$addToSet": {"badges": {"$each": badges}}})
+        for user_id, badges in awards.items()
+    ], ordered=False)
+    for user_id in awards:
+        user_cache.invalidate(user_id)
+    await collection_versions.bump("users")
+
+async def check_and_award_badges(user_id: str):
+    """Check and award badges based on user achievements"""
+    awards = {candidate: badges async for candidate, badges in badge_candidates({"user_id": user_id})}
+    await award_badges(awards)
+
+class CatalogSnapshot:
+    """Immutable view of every challenge with precomputed indexes"""
+    
+    def __init__(self, challenges: List[dict], version: int):
+        self.version = version
+        ordered = sorted(challenges, key=lambda challenge: challenge["created_at"])
+        self.challenges: Dict[str, dict] = {challenge["id"]: challenge for challenge in ordered}
+        self.by_status: Dict[str, List[dict]] = {}
+        self.by_category: Dict[str, List[dict]] = {}
+        self.by_difficulty: Dict[str, List[dict]] = {}
+        for challenge in ordered:
+            self.by_status.setdefault(challenge["status"], []).append(challenge)
+            self.by_category.setdefault(challenge["category"], []).append(challenge)
+            self.by_difficulty.setdefault(challenge["difficulty"], []).append(challenge)
+        self.by_deadline = sorted(
+            (to_utc_naive(challenge["deadline"]), challenge["id"]) for challenge in ordered
+        )
+    
+    def get(self, challenge_id: str) -> Optional[dict]:
+        return self.challenges.get(challenge_id)
+    
+    def filter(
+        self,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> List[dict]:
+        """Same semantics as the equivalent MongoDB query, in creation order"""
+        candidates = list(self.challenges.values())
+        conditions = []
+        for field, value, index in (
+            ("status", status, self.by_status),
+            ("category", category, self.by_category),
+            ("difficulty", difficulty, self.by_difficulty)
+        ):
+            if value:
+                bucket = index.get(value, [])
+                if len(bucket) < len(candidates):
+                    candidates = bucket
+                conditions.append((field, value))
+        
+        pattern = re.compile(search, re.IGNORECASE) if search else None
+        results = []
+        for challenge in candidates:
+            if any(challenge[field] != value for field, value in conditions):
+                continue
+            if pattern and not (
+                pattern.search(challenge["title"])
+                or pattern.search(challenge["description"])
+                or any(pattern.search(tag) for tag in challenge.get("tags", []))
+            ):
+                continue
+            results.append(challenge)
+        return results
+    
+    def search(self, query: str, limit: int) -> List[str]:
+        """Ids of active challenges containing a normalized query, title
+        matches first, then tags, then descriptions (creation order within each)"""
+        tiers = ([], [], [])
+        for challenge in self.by_status.get(ChallengeStatus.ACTIVE.value, []):
+            if query in challenge["title"].lower():
+                tiers[0].append(challenge["id"])
+            elif any(query in tag.lower() for tag in challenge.get("tags", [])):
+                tiers[1].append(challenge["id"])
+            elif query in challenge["description"].lower():
+                tiers[2].append(challenge["id"])
+        return (tiers[0] + tiers[1] + tiers[2])[:limit]
+    
+    def open_ids(self, now: datetime) -> set:
+        """Ids of challenges whose deadline is still ahead of `now`"""
+        position = bisect.bisect_right(self.by_deadline, (now, chr(0x10FFFF)))
+        return {challenge_id for _, challenge_id in self.by_deadline[position:]}
+
+# Deleted challenges stay behind as tombstones (deleted_at set) until
+# their cascade finishes; every read of live challenges filters them out.
+LIVE_CHALLENGE = {"deleted_at": None}
+
+class ChallengeCatalog:
+    """Process-local, versioned snapshot of the challenge catalog.
+    
+    Loaded at startup and replaced (copy-on-write) whenever a handler in
+    this process writes a challenge, so readers always see a consistent
+    snapshot. A periodic reload picks up writes from other processes.
+    Documents are shared and must not be mutated by readers. Handlers that
+    write challenges also bump the shared "challenges" version.
+    """
+    
+    def __init__(self):
+        self.boot_id = uuid.uuid4().hex
+        self.snapshot = CatalogSnapshot([], 0)
+    
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+    
+    @property
+    def etag_part(self) -> str:
+        """Identifies this process's snapshot, for ETags of responses built from it"""
+        return f"{self.boot_id}:{self.version}"
+    
+    def _replace(self, challenges: List[dict]):
+        self.snapshot = CatalogSnapshot(challenges, self.snapshot.version + 1)
+    
+    async def load(self):
+        challenges = await db.challenges.find(LIVE_CHALLENGE, {"_id": 0, "outbox": 0}).to_list(None)
+        if {challenge["id"]: challenge for challenge in challenges} != self.snapshot.challenges:
+            self._replace(challenges)
+    
+    def upsert(self, challenge: dict):
+        challenge = {key: value for key, value in challenge.items() if key != "_id"}
+        for field in ("status", "category", "difficulty"):
+            if isinstance(challenge[field], Enum):
+                challenge[field] = challenge[field].value
+        challenge["deadline"] = to_utc_naive(challenge["deadline"])
+        challenges = dict(self.snapshot.challenges)
+        challenges[challenge["id"]] = challenge
+        self._replace(list(challenges.values()))
+    
+    def update_fields(self, challenge_id: str, fields: dict):
+        challenge = self.snapshot.get(challenge_id)
+        if challenge:
+            self.upsert({**challenge, **fields})
+    
+    def remove(self, challenge_id: str):
+        challenges = dict(self.snapshot.challenges)
+        if challenges.pop(challenge_id, None) is not None:
+            self._replace(list(challenges.values()))
+
+challenge_catalog = ChallengeCatalog()
+
+def normalize_search_query(q: str) -> str:
+    """Search is a case-insensitive substring match, so queries differing
+    only in case or spacing share a cache entry"""
+    return " ".join(q.split()).lower()
+
+class SearchResultCache:
+    """Bounded LRU cache of normalized query -> ranked challenge ids.
+    
+    Entries remember the catalog version they were computed from, so any
+    challenge write (which replaces the catalog snapshot) invalidates them
+    all without bookkeeping. Per-user flags are never cached.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    def get(self, catalog: CatalogSnapshot, query: str) -> List[str]:
+        entry = self._entries.get(query)
+        if entry is not None and entry[0] == catalog.version:
+            self.hits += 1
+            self._entries.move_to_end(query)
+            return entry[1]
+        
+        self.misses += 1
+        ids = catalog.search(query, SEARCH_RESULTS_MAX)
+        self._entries[query] = (catalog.version, ids)
+        self._entries.move_to_end(query)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return ids
+    
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+search_cache = SearchResultCache(SEARCH_CACHE_MAX_SIZE)
+
+def get_challenge_titles(challenge_ids) -> dict:
+    """Map challenge ids to titles from the catalog snapshot"""
+    snapshot = challenge_catalog.snapshot
+    titles = {}
+    for challenge_id in challenge_ids:
+        challenge = snapshot.get(challenge_id)
+        if challenge:
+            titles[challenge_id] = challenge["title"]
+    return titles
 
 async def create_notification(user_id: str, title: str, message: str, notification_type: str):
     """Create a notification for a user"""
@@ -377,8 +1233,923 @@ async def create_notification(user_id: str, title: str, message: str, notificati
         type=notification_type
     )
     await db.notifications.insert_one(notification.dict())
+    await collection_versions.bump("notifications")
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize a datetime to the naive UTC form MongoDB returns"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class DeadlineScheduler:
+    """In-process scheduler for challenge deadlines, built on a heap.
+    
+    At a challenge's deadline it moves the challenge out of ACTIVE (to
+    EVALUATION when solutions still await a score, CLOSED otherwise), and
+    CHALLENGE_REMINDER_LEAD before it notifies active users who have not
+    submitted yet. Events are validated against the database when they
+    fire, so edits and deletions only need to schedule new events; stale
+    ones are skipped. Conditional updates keep several server processes
+    from applying the same event twice. An event that fails (e.g. on a
+    transient database error) is pushed back with a backoff delay.
+    """
+    
+    REMINDER = "reminder"
+    DEADLINE = "deadline"
+    
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def schedule(self, challenge: dict):
+        """Queue the reminder and deadline events for a challenge"""
+        deadline = to_utc_naive(challenge["deadline"])
+        heapq.heappush(self._heap, (deadline, self.DEADLINE, challenge["id"], 0))
+        if not challenge.get("reminder_sent"):
+            heapq.heappush(self._heap, (deadline - CHALLENGE_REMINDER_LEAD, self.REMINDER, challenge["id"], 0))
+        self._wakeup.set()
+    
+    def load(self):
+        """Rebuild the schedule from active challenges in the catalog"""
+        self._heap = []
+        for challenge in challenge_catalog.snapshot.by_status.get(ChallengeStatus.ACTIVE, []):
+            self.schedule(challenge)
+
+    
+    async def run_due(self) -> int:
+        """Process every event whose time has come; returns how many fired"""
+        processed = 0
+        while self._heap and self._heap[0][0] <= datetime.utcnow():
+            _, kind, challenge_id, failures = heapq.heappop(self._heap)
+            try:
+                if kind == self.DEADLINE:
+                    await self._close_challenge(challenge_id)
+                else:
+                    await self._send_reminders(challenge_id)
+            except Exception:
+                logger.exception("Failed to process %s event for challenge %s", kind, challenge_id)
+                delay = min(SCHEDULER_RETRY_BASE * 2 ** failures, SCHEDULER_RETRY_MAX)
+                heapq.heappush(self._heap, (datetime.utcnow() + delay, kind, challenge_id, failures + 1))
+            processed += 1
+        return processed
+    
+    async def _close_challenge(self, challenge_id: str):
+        now = datetime.utcnow()
+        pending = await db.solutions.count_documents({"challenge_id": challenge_id, "score": None})
+        new_status = ChallengeStatus.EVALUATION if pending else ChallengeStatus.CLOSED
+        # Skipped when the challenge was deleted, already closed, or its deadline moved
+        result = await db.challenges.update_one(
+            {"id": challenge_id, "status": ChallengeStatus.ACTIVE, "deadline": {"$lte": now}, **LIVE_CHALLENGE},
+            {"$set": {"status": new_status}}
+        )
+        if result.modified_count:
+            challenge_catalog.update_fields(challenge_id, {"status": new_status.value})
+            await collection_versions.bump("challenges")
+    
+    async def _send_reminders(self, challenge_id: str):
+        now = datetime.utcnow()
+        challenge = await db.challenges.find_one(
+            {
+                "id": challenge_id,
+                "status": ChallengeStatus.ACTIVE,
+                "reminder_sent": {"$ne": True},
+                **LIVE_CHALLENGE,
+                "deadline": {"$gt": now, "$lte": now + CHALLENGE_REMINDER_LEAD}
+            },
+            {"id": 1, "title": 1}
+        )
+        if not challenge:
+            return
+        
+        submitted = set(await db.solutions.distinct("user_id", {"challenge_id": challenge_id}))
+        users = await db.users.find(
+            {"is_active": True, "role": {"$ne": UserRole.ADMIN}},
+            {"id": 1}
+        ).to_list(None)
+        
+        batch = []
+        for user in users:
+            if user["id"] in submitted:
+                continue
+            # One reminder per user and challenge, however often this is retried
+            # or whichever processes send it at the same time
+            batch.append({
+                "_id": f"reminder:{challenge_id}:{user['id']}",
+                **Notification(
+                    user_id=user["id"],
+                    title="Prazo Encerrando! ⏰",
+                    message=f"O desafio '{challenge['title']}' encerra em menos de 24 horas. Envie sua solução!",
+                    type="challenge",
+                    challenge_id=challenge_id
+                ).dict()
+            })
+            if len(batch) >= NOTIFICATION_BATCH_SIZE:
+                await insert_ignoring_duplicates(db.notifications, batch)
+                batch = []
+        if batch:
+            await insert_ignoring_duplicates(db.notifications, batch)
+        await collection_versions.bump("notifications")
+        # Marked only once every reminder is written, so a failed run is retried in full
+        await db.challenges.update_one({"id": challenge_id}, {"$set": {"reminder_sent": True}})
+        challenge_catalog.update_fields(challenge_id, {"reminder_sent": True})
+    
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            await self.run_due()
+            timeout = None
+            if self._heap:
+                timeout = max(0.0, (self._heap[0][0] - datetime.utcnow()).total_seconds())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self.load()
+        self._task = asyncio.create_task(self._run())
+    
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+deadline_scheduler = DeadlineScheduler()
+
+async def insert_ignoring_duplicates(collection, documents: List[dict]):
+    """insert_many that treats already-present _ids as success (idempotent retries)"""
+    try:
+        await collection.insert_many(documents, ordered=False)
+    except BulkWriteError as error:
+        if any(write_error["code"] != 11000 for write_error in error.details["writeErrors"]):
+            raise
+
+def outbox_entry(job_type: str, key: str, **payload) -> dict:
+    """A job to store in a document's `outbox` array, written by the same
+    operation as the document itself. `key` makes the job idempotent."""
+    return {"key": key, "type": job_type, "payload": payload}
+
+class JobQueue:
+    """Durable queue for side effects of writes (transactional outbox).
+    
+    Handlers embed jobs in the `outbox` array of the document they write,
+    so the job commits atomically with the primary write. A relay copies
+    outbox entries into the `jobs` collection, keyed by their idempotency
+    key so re-relaying after a crash is harmless, and pulls them from the
+    source document. Workers lease jobs, renew the lease while the handler
+    runs, retry failures with exponential backoff and move jobs that
+    exhaust JOB_MAX_ATTEMPTS to `dead_jobs`. A job whose worker died is
+    claimed again once its lease expires, so handlers must tolerate
+    running more than once.
+    """
+    
+    OUTBOX_COLLECTIONS = ("solutions", "challenges")
+    # Only documents with undelivered entries are in the partial outbox
+    # index, so a relay pass reads just those instead of the collection
+    HAS_OUTBOX = {"outbox.key": {"$exists": True}}
+    
+    def __init__(self):
+        self.handlers: Dict[str, object] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def handler(self, job_type: str):
+        def register(fn):
+            self.handlers[job_type] = fn
+            return fn
+        return register
+    
+    def notify(self):
+        """Wake the in-process workers after a write that queued jobs"""
+        self._wakeup.set()
+    
+    async def relay(self) -> int:
+        """Move outbox entries into the jobs collection; returns how many"""
+        relayed = 0
+        for name in self.OUTBOX_COLLECTIONS:
+            documents = await db[name].find(
+                self.HAS_OUTBOX, {"_id": 0, "id": 1, "outbox": 1}
+            ).to_list(None)
+            for document in documents:
+                now = datetime.utcnow()
+                await insert_ignoring_duplicates(db.jobs, [{
+                    "_id": entry["key"],
+                    "type": entry["type"],
+                    "payload": entry["payload"],
+                    "status": "pending",
+                    "attempts": 0,
+                    "run_at": now,
+                    "created_at": now
+                } for entry in document["outbox"]])
+                await db[name].update_one(
+                    {"id": document["id"]},
+                    {"$pull": {"outbox": {"key": {"$in": [entry["key"] for entry in document["outbox"]]}}}}
+                )
+                relayed += len(document["outbox"])
+        return relayed
+    
+    async def claim(self) -> Optional[dict]:
+        """Lease the next due job, including ones whose worker died mid-run"""
+        while True:
+            now = datetime.utcnow()
+            job = await db.jobs.find_one_and_update(
+                {"$or": [
+                    {"status": "pending", "run_at": {"$lte": now}},
+                    {"status": "running", "lease_until": {"$lte": now}}
+                ]},
+                {
+                    "$set": {"status": "running", "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS)},
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("run_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if not job or job["attempts"] <= JOB_MAX_ATTEMPTS:
+                return job
+            # Every attempt so far ended with its worker dying (lease expired
+            # without the handler returning or raising), so stop re-leasing it
+            logger.error("Job %s lost its worker on all %d attempts", job["_id"], JOB_MAX_ATTEMPTS)
+            await self._bury({**job, "attempts": JOB_MAX_ATTEMPTS}, "lease expired on every attempt")
+    
+    async def _bury(self, job: dict, error: str):
+        await insert_ignoring_duplicates(db.dead_jobs, [
+            {**job, "status": "dead", "last_error": error, "failed_at": datetime.utcnow()}
+        ])
+        await db.jobs.delete_one({"_id": job["_id"]})
+    
+    async def _renew_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOB_LEASE_RENEW_SECONDS)
+            try:
+                await db.jobs.update_one(
+                    {"_id": job_id, "status": "running"},
+                    {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)}}
+                )
+            except Exception:
+                logger.exception("Failed to renew the lease of job %s", job_id)
+    
+    async def process(self, job: dict):
+        heartbeat = asyncio.create_task(self._renew_lease(job["_id"]))
+        try:
+            handler = self.handlers[job["type"]]
+            await handler(job["_id"], **job["payload"])
+        except Exception as error:
+            logger.exception("Job %s failed (attempt %d)", job["_id"], job["attempts"])
+            if job["attempts"] >= JOB_MAX_ATTEMPTS:
+                await self._bury(job, repr(error))
+            else:
+                delay = JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                await db.jobs.update_one(
+                    {"_id": job["_id"]},
+                    {"$set": {
+                        "status": "pending",
+                        "run_at": datetime.utcnow() + timedelta(seconds=delay),
+                        "last_error": repr(error)
+                    }}
+                )
+            return
+        finally:
+            heartbeat.cancel()
+        # Done jobs are kept (until the finished_at TTL index expires them)
+        # so a late re-relay of the same key is a no-op
+        await db.jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"status": "done", "finished_at": datetime.utcnow()}, "$unset": {"lease_until": ""}}
+        )
+    
+    async def _work(self) -> int:
+        processed = 0
+        while True:
+            job = await self.claim()
+            if not job:
+                return processed
+            await self.process(job)
+            processed += 1
+    
+    async def run_pending(self, workers: int = 1) -> int:
+        """Relay outboxes, then run due jobs until none are left; returns how many ran"""
+        await self.relay()
+        counts = await asyncio.gather(*(self._work() for _ in range(max(1, workers))))
+        return sum(counts)
+    
+    async def _run(self, workers: int):
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.run_pending(workers)
+            except Exception:
+                logger.exception("Job queue pass failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    
+    def start(self, workers: int):
+        self._wakeup = asyncio.Event()
+        if workers > 0:
+            self._task = asyncio.create_task(self._run(workers))
+    
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+job_queue = JobQueue()
+
+@job_queue.handler("award_badges")
+async def award_badges_job(key: str, user_id: str):
+    await check_and_award_badges(user_id)
+
+@job_queue.handler("notify")
+async def notify_job(key: str, user_id: str, title: str, message: str, notification_type: str,
+                     challenge_id: Optional[str] = None):
+    notification = Notification(
+        user_id=user_id, title=title, message=message, type=notification_type, challenge_id=challenge_id
+    )
+    await insert_ignoring_duplicates(db.notifications, [{"_id": key, **notification.dict()}])
+    await collection_versions.bump("notifications")
+
+@job_queue.handler("announce_challenge")
+async def announce_challenge_job(key: str, challenge_id: str, title: str, points_reward: int, created_by: str):
+    """Notify all active users about a new challenge, in batches"""
+    users = await db.users.find({"is_active": True, "id": {"$ne": created_by}}, {"id": 1}).to_list(None)
+    for start in range(0, len(users), NOTIFICATION_BATCH_SIZE):
+        await insert_ignoring_duplicates(db.notifications, [
+            {
+                "_id": f"{key}:{user['id']}",
+                **Notification(
+                    user_id=user["id"],
+                    title="Novo Desafio Disponível! 🎯",
+                    message=f"Um novo desafio foi criado: '{title}'. Participe e ganhe {points_reward} pontos!",
+                    type="challenge",
+                    challenge_id=challenge_id
+                ).dict()
+            }
+            for user in users[start:start + NOTIFICATION_BATCH_SIZE]
+        ])
+    await collection_versions.bump("notifications")
+
+# Attachments are stored once per SHA-256 digest in `attachments`
+# ({_id: digest, data, size, refcount}); solutions keep "sha256:<digest>"
+# refs in `files`. Every solution holding a ref counts once per ref.
+ATTACHMENT_REF_PREFIX = "sha256:"
+ATTACHMENT_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+def attachment_digest(ref: str) -> Optional[str]:
+    """The digest in an attachment ref, or None for inline (legacy) data"""
+    if ref.startswith(ATTACHMENT_REF_PREFIX) and ATTACHMENT_DIGEST.match(ref[len(ATTACHMENT_REF_PREFIX):]):
+        return ref[len(ATTACHMENT_REF_PREFIX):]
+    return None
+
+def attachment_ref_counts(solutions: List[dict]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for solution in solutions:
+        for ref in solution.get("files", []):
+            digest = attachment_digest(ref)
+            if digest:
+                counts[digest] = counts.get(digest, 0) + 1
+    return counts
+
+async def can_read_attachments(current_user: CurrentUser, digests: List[str]) -> bool:
+    """Admins may read every attachment; other users only the ones held by
+    one of their own solutions"""
+    if current_user.role == UserRole.ADMIN:
+        return True
+    refs = [ATTACHMENT_REF_PREFIX + digest for digest in digests]
+    held = await db.solutions.distinct("files", {"user_id": current_user.id, "files": {"$in": refs}})
+    return set(refs) <= set(held)
+
+async def store_attachments(files: List[str], current_user: Optional[CurrentUser]) -> List[str]:
+    """Store uploaded files once per digest and take a reference on each.
+    
+    `files` holds base64 data or refs to attachments that already exist.
+    Data whose digest is already stored is not written again; only its
+    reference count changes. Refs must point at attachments `current_user`
+    can read; None skips that check for trusted maintenance scripts.
+    Returns the refs to keep on the solution.
+    """
+    uploads: Dict[str, bytes] = {}
+    counts: Dict[str, int] = {}
+    refs = []
+    for value in files:
+        digest = attachment_digest(value)
+        if digest is None:
+            try:
+                data = base64.b64decode(value, validate=True)
+            except (binascii.Error, ValueError):
+                raise HTTPException(status_code=400, detail="Attachments must be base64 encoded")
+            digest = hashlib.sha256(data).hexdigest()
+            uploads[digest] = data
+        counts[digest] = counts.get(digest, 0) + 1
+        refs.append(ATTACHMENT_REF_PREFIX + digest)
+    if not counts:
+        return refs
+    
+    now = datetime.utcnow()
+    # Refs without data must point at an attachment the collector cannot
+    # delete before the $inc below lands
+    referenced = [digest for digest in counts if digest not in uploads]
+    if referenced:
+        # Same message either way, so refs cannot probe for other users' files
+        if current_user and not await can_read_attachments(current_user, referenced):
+            raise HTTPException(status_code=400, detail="Unknown attachment reference")
+        live = await db.attachments.count_documents({
+            "_id": {"$in": referenced},
+            "$or": [{"refcount": {"$gt": 0}}, {"released_at": {"$gt": now - ATTACHMENT_GC_GRACE}}]
+        })
+        if live < len(referenced):
+            raise HTTPException(status_code=400, detail="Unknown attachment reference")
+    
+    operations = []
+    for digest, count in counts.items():
+        if digest in uploads:
+            # Upsert even when the digest exists: it may be collected meanwhile
+            operations.append(UpdateOne(
+                {"_id": digest},
+                {
+                    "$inc": {"refcount": count},
+                    "$setOnInsert": {"data": uploads[digest], "size": len(uploads[digest]), "created_at": now}
+                },
+                upsert=True
+            ))
+        else:
+            operations.append(UpdateOne({"_id": digest}, {"$inc": {"refcount": count}}))
+    await db.attachments.bulk_write(operations, ordered=False)
+    return refs
+
+async def release_attachments(counts: Dict[str, int]):
+    """Drop references; attachments left unreferenced are removed by collect_attachments()"""
+    if counts:
+        now = datetime.utcnow()
+        await db.attachments.bulk_write([
+            UpdateOne({"_id": digest}, {"$inc": {"refcount": -count}, "$set": {"released_at": now}})
+            for digest, count in counts.items()
+        ], ordered=False)
+
+async def collect_attachments() -> int:
+    """Delete attachments that have been unreferenced for ATTACHMENT_GC_GRACE"""
+    result = await db.attachments.delete_many({
+        "refcount": {"$lte": 0},
+        "released_at": {"$lte": datetime.utcnow() - ATTACHMENT_GC_GRACE}
+    })
+    return result.deleted_count
+
+@job_queue.handler("cascade_delete_challenge")
+async def cascade_delete_challenge_job(key: str, challenge_id: str):
+    """Archive a tombstoned challenge's solutions, release their attachments
+    and delete its notifications, CASCADE_BATCH_SIZE documents at a time.
+    Progress is recorded on the tombstone; re-running resumes safely."""
+    while True:
+        solutions = await db.solutions.find({"challenge_id": challenge_id}).limit(CASCADE_BATCH_SIZE).to_list(CASCADE_BATCH_SIZE)
+        if not solutions:
+            break
+        archived_at = datetime.utcnow()
+        await insert_ignoring_duplicates(
+            db.archived_solutions, [{**solution, "archived_at": archived_at} for solution in solutions]
+        )
+        # A second worker can run this job at the same time after a lease
+        # expiry and find the same batch; only the solutions this run deleted
+        # are released and counted, so no reference is dropped twice
+        results = await asyncio.gather(*(
+            db.solutions.delete_one({"_id": solution["_id"]}) for solution in solutions
+        ))
+        deleted = [solution for solution, result in zip(solutions, results) if result.deleted_count]
+        if deleted:
+            # Archived solutions keep their file names, not the attachment data
+            await release_attachments(attachment_ref_counts(deleted))
+            await db.challenges.update_one(
+                {"id": challenge_id}, {"$inc": {"cascade.solutions_archived": len(deleted)}}
+            )
+            await collection_versions.bump("solutions")
+        await asyncio.sleep(0)
+    
+    while True:
+        notifications = await db.notifications.find(
+            {"challenge_id": challenge_id}, {"_id": 1}
+        ).limit(CASCADE_BATCH_SIZE).to_list(CASCADE_BATCH_SIZE)
+        if not notifications:
+            break
+        result = await db.notifications.delete_many({"_id": {"$in": [n["_id"] for n in notifications]}})
+        await db.challenges.update_one(
+            {"id": challenge_id}, {"$inc": {"cascade.notifications_deleted": result.deleted_count}}
+        )
+        await collection_versions.bump("notifications")
+        await asyncio.sleep(0)
+    
+    await db.challenges.update_one(
+        {"id": challenge_id},
+        {"$set": {"cascade.done": True, "cascade.finished_at": datetime.utcnow()}}
+    )
+    challenge_analytics.invalidate(challenge_id)
+
+def score_percentile(distribution: List[tuple], q: float) -> float:
+    """q-th percentile of a sorted [(score, count)] distribution, with the
+    same linear interpolation as numpy.percentile on the expanded scores"""
+    total = sum(count for _, count in distribution)
+    position = (total - 1) * q / 100
+    lower_index = int(position)
+    cumulative = []
+    running = 0
+    for _, count in distribution:
+        running += count
+        cumulative.append(running)
+    
+    def value_at(index: int) -> float:
+        return distribution[bisect.bisect_right(cumulative, index)][0]
+    
+    lower = value_at(lower_index)
+    if lower_index + 1 >= total:
+        return float(lower)
+    return lower + (value_at(lower_index + 1) - lower) * (position - lower_index)
+
+def summarize_scores(challenge: dict, table: dict) -> dict:
+    """Analytics for one challenge from its score frequency table"""
+    distribution = sorted((int(score), count) for score, count in table["scores"].items())
+    evaluated = sum(count for _, count in distribution)
+    histogram = [
+        {"min_score": low, "max_score": min(low + SCORE_HISTOGRAM_WIDTH - 1, SCORE_HISTOGRAM_MAX), "count": 0}
+        for low in range(0, SCORE_HISTOGRAM_MAX, SCORE_HISTOGRAM_WIDTH)
+    ]
+    histogram[-1]["max_score"] = SCORE_HISTOGRAM_MAX
+    for score, count in distribution:
+        bucket = min(max(score, 0), SCORE_HISTOGRAM_MAX - 1) // SCORE_HISTOGRAM_WIDTH
+        histogram[bucket]["count"] += count
+    
+    summary = {
+        "challenge_id": challenge["id"],
+        "title": challenge["title"],
+        "status": challenge["status"],
+        "submissions": table["submissions"],
+        "evaluated": evaluated,
+        "pending": table["submissions"] - evaluated,
+        "evaluation_progress": evaluated / table["submissions"] if table["submissions"] else 0.0,
+        "mean_score": None,
+        "median_score": None,
+        "percentiles": {},
+        "histogram": histogram
+    }
+    if distribution:
+        summary["mean_score"] = sum(score * count for score, count in distribution) / evaluated
+        summary["median_score"] = score_percentile(distribution, 50)
+        summary["percentiles"] = {f"p{q}": score_percentile(distribution, q) for q in (25, 75, 90)}
+    return summary
+
+class ChallengeAnalyticsCache:
+    """Score frequency tables per challenge, built by one $group over
+    (challenge_id, score) for every challenge that is not cached.
+    
+    submit_solution and evaluate_solution invalidate the challenge they
+    touch; the TTL covers writes made by other processes.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tables: Dict[str, tuple] = {}  # challenge id -> (expires at, table)
+        self._generation = 0
+    
+    async def tables(self, challenge_ids: List[str]) -> Dict[str, dict]:
+        now = time.monotonic()
+        found = {}
+        missing = []
+        for challenge_id in challenge_ids:
+            entry = self._tables.get(challenge_id)
+            if entry is not None and entry[0] > now:
+                found[challenge_id] = entry[1]
+            else:
+                missing.append(challenge_id)
+        if not missing:
+            return found
+        
+        generation = self._generation
+        loaded = {challenge_id: {"submissions": 0, "scores": {}} for challenge_id in missing}
+        rows = await db.solutions.aggregate([
+            {"$match": {"challenge_id": {"$in": missing}}},
+            {"$group": {"_id": {"challenge_id": "$challenge_id", "score": "$score"}, "count": {"$sum": 1}}}
+        ]).to_list(None)
+        for row in rows:
+            table = loaded[row["_id"]["challenge_id"]]
+            table["submissions"] += row["count"]
+            score = row["_id"].get("score")
+            if score is not None:
+                table["scores"][score] = row["count"]
+        
+        # Results that raced with an invalidation are returned but not cached
+        if generation == self._generation:
+            expires = time.monotonic() + self.ttl
+            for challenge_id, table in loaded.items():
+                self._tables[challenge_id] = (expires, table)
+        return {**found, **loaded}
+    
+    def invalidate(self, challenge_id: str):
+        self._generation += 1
+        self._tables.pop(challenge_id, None)
+    
+    def clear(self):
+        self._generation += 1
+        self._tables.clear()
+
+challenge_analytics = ChallengeAnalyticsCache(ANALYTICS_CACHE_SECONDS)
+
+# Points ledger. Every award is appended to `points_ledger`; per-window
+# rollups in `points_rollups` are incremented alongside so windowed and
+# per-category leaderboards are a single indexed read. Both users.points
+# and the rollups can be rebuilt from the ledger (reconcile_points).
+ALL_CATEGORIES = "all"
+
+class PointsEntry(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    user_id: str
+    points: int
+    reason: str  # "evaluation", "opening_balance"
+    solution_id: Optional[str] = None
+    challenge_id: Optional[str] = None
+    category: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+def window_buckets(when: datetime) -> Dict[str, str]:
+    """The bucket an instant falls in for each leaderboard window (UTC)"""
+    year, week, _ = when.isocalendar()
+    return {
+        LeaderboardWindow.DAY.value: when.strftime("%Y-%m-%d"),
+        LeaderboardWindow.WEEK.value: f"{year}-W{week:02d}",
+        LeaderboardWindow.MONTH.value: when.strftime("%Y-%m"),
+        LeaderboardWindow.ALL.value: "all"
+    }
+
+def rollup_key(window: str, bucket: str, category: str, user_id: str) -> str:
+    return f"{window}:{bucket}:{category}:{user_id}"
+
+def rollup_increments(entries: List[dict]) -> Dict[tuple, int]:
+    """Sum ledger entries into (window, bucket, category, user_id) -> points"""
+    totals: Dict[tuple, int] = {}
+    for entry in entries:
+        categories = [ALL_CATEGORIES] + ([entry["category"]] if entry.get("category") else [])
+        for window, bucket in window_buckets(entry["created_at"]).items():
+            for category in categories:
+                key = (window, bucket, category, entry["user_id"])
+                totals[key] = totals.get(key, 0) + entry["points"]
+    return totals
+
+def rollup_operations(totals: Dict[tuple, int], rebuild: Optional[str] = None) -> List[UpdateOne]:
+    """Upserts that add `totals` to the rollups, or overwrite them when
+    tagged with a `rebuild` id"""
+    operations = []
+    for (window, bucket, category, user_id), points in totals.items():
+        fields = {"window": window, "bucket": bucket, "category": category, "user_id": user_id}
+        if rebuild:
+            update = {"$set": {**fields, "points": points, "rebuild": rebuild}}
+        else:
+            update = {"$inc": {"points": points}, "$setOnInsert": fields}
+        operations.append(UpdateOne({"_id": rollup_key(window, bucket, category, user_id)}, update, upsert=True))
+    return operations
+
+async def record_points(entry: PointsEntry):
+    """Append to the ledger, then apply the award to users.points and the rollups"""
+    document = entry.dict()
+    await db.points_ledger.insert_one(document)
+    await db.users.update_one({"id": entry.user_id}, {"$inc": {"points": entry.points}})
+    await db.points_rollups.bulk_write(rollup_operations(rollup_increments([document])), ordered=False)
+    user_cache.invalidate(entry.user_id)
+    await collection_versions.bump("users", "points")
+
+async def reconcile_points(batch_size: int = 1000) -> dict:
+    """Rebuild users.points and every rollup from the ledger.
+    
+    Users with points but no ledger entries are reset to 0, so legacy
+    balances must be migrated first (reconcile_points.py --opening-balances).
+    Points and rollups are overwritten from a ledger scan, so awards
+    recorded while this runs can be lost until the next run: run it with
+    evaluations paused. `concurrent_entries` in the result counts ledger
+    entries that arrived during the run; if it is not 0, run again.
+    """
+    started = datetime.utcnow()
+    totals: Dict[str, int] = {}
+    rollups: Dict[tuple, int] = {}
+    batch = []
+    async for entry in db.points_ledger.find({}, {"_id": 0}):
+        totals[entry["user_id"]] = totals.get(entry["user_id"], 0) + entry["points"]
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            for key, points in rollup_increments(batch).items():
+                rollups[key] = rollups.get(key, 0) + points
+            batch = []
+    for key, points in rollup_increments(batch).items():
+        rollups[key] = rollups.get(key, 0) + points
+    
+    corrected = []
+    async for user in db.users.find({}, {"_id": 0, "id": 1, "points": 1}):
+        expected = totals.get(user["id"], 0)
+        if user.get("points", 0) != expected:
+            corrected.append(UpdateOne({"id": user["id"]}, {"$set": {"points": expected}}))
+    for start in range(0, len(corrected), batch_size):
+        await db.users.bulk_write(corrected[start:start + batch_size], ordered=False)
+    
+    # Rollups are derived data: rewrite the ones the ledger implies, drop the rest
+    rebuild = str(uuid.uuid4())
+    operations = rollup_operations(rollups, rebuild)
+    for start in range(0, len(operations), batch_size):
+        await db.points_rollups.bulk_write(operations[start:start + batch_size], ordered=False)
+    await db.points_rollups.delete_many({"rebuild": {"$ne": rebuild}})
+    
+    user_cache.clear()
+    await collection_versions.bump("users", "points")
+    concurrent = await db.points_ledger.count_documents({"created_at": {"$gte": started}})
+    return {"users_corrected": len(corrected), "rollups": len(rollups), "concurrent_entries": concurrent}
+
+# List builders shared by the individual routes and /dashboard
+def challenge_items(catalog: "CatalogSnapshot", challenges: List[dict], submitted_ids: set, fields: Optional[tuple] = None) -> List[dict]:
+    open_challenge_ids = catalog.open_ids(datetime.utcnow())
+    return [
+        project_document(
+            ChallengeResponse,
+            challenge,
+            fields,
+            user_submitted=challenge["id"] in submitted_ids,
+            can_submit=challenge["id"] in open_challenge_ids and challenge["id"] not in submitted_ids
+        )
+        for challenge in challenges
+    ]
+
+def my_solution_items(solutions: List[dict], user: Optional[dict], fields: Optional[tuple] = None) -> List[dict]:
+    challenge_titles = get_challenge_titles({solution["challenge_id"] for solution in solutions})
+    user_name = user["name"] if user else "Unknown"
+    return [
+        project_document(
+            SolutionResponse,
+            solution,
+            fields,
+            challenge_title=challenge_titles.get(solution["challenge_id"], "Unknown"),
+            user_name=user_name
+        )
+        for solution in solutions
+    ]
+
+# Leaderboard order is points descending with ties broken by user id, so
+# every active user has exactly one rank. LEADERBOARD_INDEX covers the
+# sort and the range filters below: a rank is one index-only count and a
+# neighborhood is two seeks of at most k keys each.
+LEADERBOARD_SORT = [("points", -1), ("id", 1)]
+LEADERBOARD_INDEX = [("is_active", 1), ("points", -1), ("id", 1)]
+LEADERBOARD_PROJECTION = {"_id": 0, "id": 1, "name": 1, "points": 1, "badges": 1}
+
+def ranked_above(user: dict) -> dict:
+    return {"is_active": True, "$or": [
+        {"points": {"$gt": user["points"]}},
+        {"points": user["points"], "id": {"$lt": user["id"]}}
+    ]}
+
+def ranked_below(user: dict) -> dict:
+    return {"is_active": True, "$or": [
+        {"points": {"$lt": user["points"]}},
+        {"points": user["points"], "id": {"$gt": user["id"]}}
+    ]}
+
+async def leaderboard_rank(user: dict) -> int:
+    return await db.users.count_documents(ranked_above(user)) + 1
+
+async def leaderboard_neighborhood(user: dict, k: int) -> dict:
+    """The user's rank and the k users on either side of them"""
+    if not k:  # limit(0) would mean "no limit"
+        rank = await leaderboard_rank(user)
+        return {"rank": rank, "entries": leaderboard_items([user], rank)}
+    
+    rank, above, below = await asyncio.gather(
+        leaderboard_rank(user),
+        db.users.find(ranked_above(user), LEADERBOARD_PROJECTION).sort([("points", 1), ("id", -1)]).limit(k).to_list(k),
+        db.users.find(ranked_below(user), LEADERBOARD_PROJECTION).sort(LEADERBOARD_SORT).limit(k).to_list(k)
+    )
+    above.reverse()
+    return {"rank": rank, "entries": leaderboard_items(above + [user] + below, rank - len(above))}
+
+async def leaderboard_users() -> List[dict]:
+    return await hot_reads.do(
+        query_key("users", "leaderboard", versions=["users"]),
+        lambda: db.users.find({"is_active": True}, LEADERBOARD_PROJECTION).sort(LEADERBOARD_SORT).limit(50).to_list(50),
+        ttl=HOT_QUERY_TTL_SECONDS
+    )
+
+# Pending evaluations are solutions with score None, oldest first. A grader
+# claims one by setting a lease (claimed_by, claim_expires_at); expired
+# leases are claimable again, so a grader who walks away never blocks work.
+PENDING_EVALUATION_INDEX = [("score", 1), ("submitted_at", 1)]
+
+def claimable_by(evaluator_id: str, now: datetime) -> dict:
+    """Filter for solutions `evaluator_id` may work on: unclaimed, lease
+    expired, or already theirs"""
+    return {"$or": [
+        {"claimed_by": None},
+        {"claimed_by": evaluator_id},
+        {"claim_expires_at": {"$lte": now}}
+    ]}
+
+async def claim_pending_solutions(evaluator_id: str, count: int, challenge_id: Optional[str] = None) -> List[dict]:
+    """Lease up to `count` of the oldest unclaimed pending solutions.
+    
+    Each claim is an atomic find_one_and_update on the pending index, so
+    concurrent graders never receive the same solution.
+    """
+    claimed = []
+    for _ in range(count):
+        now = datetime.utcnow()
+        query = {
+            "score": None,
+            "$or": [{"claimed_by": None}, {"claim_expires_at": {"$lte": now}}]
+        }
+        if challenge_id:
+            query["challenge_id"] = challenge_id
+        solution = await db.solutions.find_one_and_update(
+            query,
+            {"$set": {"claimed_by": evaluator_id, "claim_expires_at": now + EVALUATION_LEASE}},
+            sort=[("submitted_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if not solution:
+            break
+        claimed.append(solution)
+    return claimed
+
+# One solution per user and challenge is enforced by this unique index;
+# submit_solution inserts first and maps duplicate key errors to a 400.
+# The index cannot be built while older duplicates exist (dedup_solutions.py
+# removes them); until it is, submissions check for an existing solution
+# first and the build is retried periodically.
+SUBMISSION_INDEX = [("challenge_id", 1), ("user_id", 1)]
+SUBMISSION_INDEX_RETRY_SECONDS = 300
+submission_index_ready = False
+
+async def ensure_submission_index():
+    global submission_index_ready
+    if submission_index_ready:
+        return
+    try:
+        await db.solutions.create_index(SUBMISSION_INDEX, unique=True)
+        submission_index_ready = True
+    except OperationFailure:
+        logger.exception(
+            "Could not create the unique submission index; run dedup_solutions.py. "
+            "Submissions check for duplicates before inserting until then"
+        )
+
+async def ensure_indexes():
+    """Indexes the hot queries rely on; create_index is a no-op when present"""
+    global submission_index_ready
+    # Lookups by application id, the per-user badge check and the
+    # backfill's $lookups into users and challenges
+    await db.users.create_index("id")
+    await db.challenges.create_index("id")
+    await db.solutions.create_index("user_id")
+    await db.users.create_index(LEADERBOARD_INDEX)
+    await db.users.create_index(USER_SEARCH_INDEX)
+    await db.points_rollups.create_index([("window", 1), ("bucket", 1), ("category", 1), ("points", -1)])
+    await db.solutions.create_index(PENDING_EVALUATION_INDEX)
+    for name in JobQueue.OUTBOX_COLLECTIONS:
+        await db[name].create_index([("outbox.key", 1)], partialFilterExpression=JobQueue.HAS_OUTBOX)
+    await db.jobs.create_index([("status", 1), ("run_at", 1)])
+    await db.jobs.create_index([("status", 1), ("lease_until", 1)])
+    await db.jobs.create_index("finished_at", expireAfterSeconds=JOB_RETENTION_SECONDS)
+    submission_index_ready = False
+    await ensure_submission_index()
+
+async def windowed_leaderboard_users(window: str, category: str) -> List[dict]:
+    """Top active users by points earned in the current `window` bucket,
+    read from the rollups; `points` in the result is the windowed total"""
+    bucket = window_buckets(datetime.utcnow())[window]
+    
+    async def load():
+        # Over-fetch so deactivated accounts can be dropped without a second query
+        rollups = await db.points_rollups.find(
+            {"window": window, "bucket": bucket, "category": category, "points": {"$gt": 0}},
+            {"_id": 0, "user_id": 1, "points": 1}
+        ).sort("points", -1).limit(100).to_list(100)
+        users = await user_cache.get_many(rollup["user_id"] for rollup in rollups)
+        ranked = []
+        for rollup in rollups:
+            user = users.get(rollup["user_id"])
+            if user and user.get("is_active", True):
+                ranked.append({**user, "points": rollup["points"]})
+        return ranked[:50]
+    
+    return await hot_reads.do(
+        query_key("points_rollups", "leaderboard", window, bucket, category, versions=["users", "points"]),
+        load,
+        ttl=HOT_QUERY_TTL_SECONDS
+    )
+
+def leaderboard_items(users: List[dict], first_rank: int = 1) -> List[dict]:
+    return [
+        project_document(LeaderboardEntry, user, user_id=user["id"], rank=first_rank + i)
+        for i, user in enumerate(users)
+    ]
 
 # Authentication Routes
+# Fields login needs: credentials, token claims and the returned profile
+LOGIN_PROJECTION = {
+    "_id": 0, "id": 1, "email": 1, "name": 1, "role": 1, "points": 1, "badges": 1,
+    "created_at": 1, "is_active": 1, "password_hash": 1, "auth_epoch": 1
+}
+
 @api_router.post("/register", response_model=Token)
 async def register(user_data: UserCreate):
     # Check if user exists
@@ -396,142 +2167,121 @@ async def register(user_data: UserCreate):
         last_login=datetime.utcnow()
     )
     
-    await db.users.insert_one(user.dict())
+    user_doc = user.dict()
+    user_doc["search_keys"] = user_search_keys(user.name, user.email)
+    await db.users.insert_one(user_doc)
+    await collection_versions.bump("users")
     
     # Create token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.id}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(user_doc)
     
-    user_profile = UserProfile(
-        id=user.id,
-        email=user.email,
-        name=user.name,
-        role=user.role,
-        points=user.points,
-        badges=user.badges,
-        created_at=user.created_at,
-        last_login=user.last_login
-    )
-    
-    return Token(access_token=access_token, token_type="bearer", user=user_profile)
+    return Token(access_token=access_token, token_type="bearer", user=UserProfile(**user_doc))
 
 @api_router.post("/login", response_model=Token)
 async def login(user_data: UserLogin):
-    user = await db.users.find_one({"email": user_data.email})
+    user = await db.users.find_one({"email": user_data.email}, LOGIN_PROJECTION)
     if not user or not verify_password(user_data.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if not user["is_active"]:
         raise HTTPException(status_code=401, detail="Account deactivated")
     
-    # Update last login
-    await db.users.update_one(
-        {"id": user["id"]},
-        {"$set": {"last_login": datetime.utcnow()}}
-    )
+    # Update last login (written in the background by last_login_buffer)
+    last_login = datetime.utcnow()
+    last_login_buffer.record(user["id"], last_login)
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user["id"]}, expires_delta=access_token_expires
-    )
+    access_token = create_user_token(user)
+    user["last_login"] = last_login
     
-    user_profile = UserProfile(
-        id=user["id"],
-        email=user["email"],
-        name=user["name"],
-        role=user["role"],
-        points=user["points"],
-        badges=user["badges"],
-        created_at=user["created_at"],
-        last_login=datetime.utcnow()
-    )
-    
-    return Token(access_token=access_token, token_type="bearer", user=user_profile)
+    return Token(access_token=access_token, token_type="bearer", user=UserProfile(**user))
 
 @api_router.get("/me", response_model=UserProfile)
-async def get_profile(current_user: User = Depends(get_current_user)):
-    return UserProfile(
-        id=current_user.id,
-        email=current_user.email,
-        name=current_user.name,
-        role=current_user.role,
-        points=current_user.points,
-        badges=current_user.badges,
-        created_at=current_user.created_at,
-        last_login=current_user.last_login
-    )
+async def get_profile(current_user: CurrentUser = Depends(get_current_user)):
+    user = await user_cache.get(current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    profile = UserProfile(**user)
+    pending_login = last_login_buffer.latest(current_user.id)
+    if pending_login:
+        profile.last_login = pending_login
+    return profile
 
 # Challenge Routes
 @api_router.post("/challenges", response_model=Challenge)
-async def create_challenge(challenge_data: ChallengeCreate, admin_user: User = Depends(get_admin_user)):
+async def create_challenge(challenge_data: ChallengeCreate, admin_user: CurrentUser = Depends(get_admin_user)):
     challenge = Challenge(
         **challenge_data.dict(),
         created_by=admin_user.id
     )
     
-    await db.challenges.insert_one(challenge.dict())
-    
-    # Notify all active users about new challenge
-    users = await db.users.find({"is_active": True}).to_list(1000)
-    for user in users:
-        if user["id"] != admin_user.id:  # Don't notify the creator
-            await create_notification(
-                user["id"],
-                "Novo Desafio Disponível! 🎯",
-                f"Um novo desafio foi criado: '{challenge.title}'. Participe e ganhe {challenge.points_reward} pontos!",
-                "challenge"
-            )
+    # Notifying active users is queued with the insert and runs in the background
+    announce = outbox_entry(
+        "announce_challenge",
+        f"announce:{challenge.id}",
+        challenge_id=challenge.id,
+        title=challenge.title,
+        points_reward=challenge.points_reward,
+        created_by=admin_user.id
+    )
+    await db.challenges.insert_one({**challenge.dict(), "outbox": [announce]})
+    challenge_catalog.upsert(challenge.dict())
+    await collection_versions.bump("challenges")
+    deadline_scheduler.schedule(challenge.dict())
+    job_queue.notify()
     
     return challenge
 
 @api_router.get("/challenges", response_model=List[ChallengeResponse])
 async def get_challenges(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
     category: Optional[ChallengeCategory] = None,
     difficulty: Optional[DifficultyLevel] = None,
     status: Optional[ChallengeStatus] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY
 ):
-    # Build filter query
-    filter_query = {}
-    if category:
-        filter_query["category"] = category
-    if difficulty:
-        filter_query["difficulty"] = difficulty
-    if status:
-        filter_query["status"] = status
-    else:
-        filter_query["status"] = ChallengeStatus.ACTIVE  # Default to active challenges
-    
-    if search:
-        filter_query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}},
-            {"tags": {"$in": [re.compile(search, re.IGNORECASE)]}}
-        ]
-    
-    challenges = await db.challenges.find(filter_query).to_list(1000)
+    selected_fields = parse_fields("challenges", fields)
+    # The list is built from this process's catalog snapshot, which may lag the database
+    etag = collection_versions.etag(
+        ["solutions"], "challenges", challenge_catalog.etag_part, current_user.id, request.url.query
+    )
+    not_modified = conditional_response(request, response, etag, "private, no-cache")
+    if not_modified:
+        return not_modified
+    
+    # Filter the in-memory catalog (defaults to active challenges)
+    catalog = challenge_catalog.snapshot
+    challenges = catalog.filter(
+        status=(status or ChallengeStatus.ACTIVE).value,
+        category=category.value if category else None,
+        difficulty=difficulty.value if difficulty else None,
+        search=search
+    )[:1000]
     
     # Check if user has submitted for each challenge
-    user_solutions = await db.solutions.find({"user_id": current_user.id}).to_list(1000)
-    submitted_challenge_ids = [sol["challenge_id"] for sol in user_solutions]
-    
-    challenge_responses = []
-    for challenge in challenges:
-        challenge_response = ChallengeResponse(
-            **challenge,
-            user_submitted=challenge["id"] in submitted_challenge_ids,
-            can_submit=datetime.utcnow() < challenge["deadline"] and challenge["id"] not in submitted_challenge_ids
-        )
-        challenge_responses.append(challenge_response)
+    user_solutions = await db.solutions.find({"user_id": current_user.id}, {"challenge_id": 1}).to_list(1000)
+    submitted_challenge_ids = {sol["challenge_id"] for sol in user_solutions}
     
-    return challenge_responses
+    return fast_json_response(
+        challenge_items(catalog, challenges, submitted_challenge_ids, selected_fields), response
+    )
 
 @api_router.get("/challenges/{challenge_id}", response_model=ChallengeResponse)
-async def get_challenge(challenge_id: str, current_user: User = Depends(get_current_user)):
-    challenge = await db.challenges.find_one({"id": challenge_id})
+async def get_challenge(
+    challenge_id: str,
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    etag = collection_versions.etag(["challenges", "solutions"], "challenge", challenge_id, current_user.id)
+    not_modified = conditional_response(request, response, etag, "private, no-cache")
+    if not_modified:
+        return not_modified
+    
+    challenge = await db.challenges.find_one({"id": challenge_id, **LIVE_CHALLENGE})
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
     
@@ -545,34 +2295,74 @@ async def get_challenge(challenge_id: str, current_user: User = Depends(get_curr
     )
 
 @api_router.put("/challenges/{challenge_id}", response_model=Challenge)
-async def update_challenge(challenge_id: str, challenge_update: ChallengeUpdate, admin_user: User = Depends(get_admin_user)):
-    challenge = await db.challenges.find_one({"id": challenge_id})
+async def update_challenge(challenge_id: str, challenge_update: ChallengeUpdate, admin_user: CurrentUser = Depends(get_admin_user)):
+    challenge = await db.challenges.find_one({"id": challenge_id, **LIVE_CHALLENGE})
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
     
     update_data = {k: v for k, v in challenge_update.dict().items() if v is not None}
     
     if update_data:
-        await db.challenges.update_one({"id": challenge_id}, {"$set": update_data})
-        updated_challenge = await db.challenges.find_one({"id": challenge_id})
+        if "deadline" in update_data:
+            # A new deadline earns a new reminder
+            update_data["reminder_sent"] = False
+        await db.challenges.update_one({"id": challenge_id, **LIVE_CHALLENGE}, {"$set": update_data})
+        updated_challenge = await db.challenges.find_one({"id": challenge_id, **LIVE_CHALLENGE})
+        if not updated_challenge:  # deleted meanwhile
+            raise HTTPException(status_code=404, detail="Challenge not found")
+        challenge_catalog.upsert(updated_challenge)
+        await collection_versions.bump("challenges")
+        if updated_challenge["status"] == ChallengeStatus.ACTIVE:
+            deadline_scheduler.schedule(updated_challenge)
         return Challenge(**updated_challenge)
     
     return Challenge(**challenge)
 
 @api_router.delete("/challenges/{challenge_id}")
-async def delete_challenge(challenge_id: str, admin_user: User = Depends(get_admin_user)):
-    challenge = await db.challenges.find_one({"id": challenge_id})
+async def delete_challenge(challenge_id: str, admin_user: CurrentUser = Depends(get_admin_user)):
+    # Tombstone the challenge; its solutions and notifications are
+    # archived/deleted by a background cascade queued in the same update
+    challenge = await db.challenges.find_one_and_update(
+        {"id": challenge_id, **LIVE_CHALLENGE},
+        {
+            "$set": {
+                "deleted_at": datetime.utcnow(),
+                "cascade": {"solutions_archived": 0, "notifications_deleted": 0, "done": False}
+            },
+            "$push": {"outbox": outbox_entry(
+                "cascade_delete_challenge", f"cascade:{challenge_id}", challenge_id=challenge_id
+            )}
+        },
+        projection={"id": 1}
+    )
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
     
-    await db.challenges.delete_one({"id": challenge_id})
+    challenge_catalog.remove(challenge_id)
+    await collection_versions.bump("challenges")
+    challenge_analytics.invalidate(challenge_id)
+    job_queue.notify()
     return {"message": "Challenge deleted successfully"}
 
+@api_router.get("/admin/challenges/{challenge_id}/deletion")
+async def get_challenge_deletion(challenge_id: str, admin_user: CurrentUser = Depends(get_admin_user)):
+    """Progress of a deleted challenge's background cascade"""
+    challenge = await db.challenges.find_one(
+        {"id": challenge_id, "deleted_at": {"$ne": None}},
+        {"_id": 0, "id": 1, "title": 1, "deleted_at": 1, "cascade": 1}
+    )
+    if not challenge:
+        raise HTTPException(status_code=404, detail="No deletion for this challenge")
+    return {"challenge_id": challenge["id"], "title": challenge["title"], "deleted_at": challenge["deleted_at"], **challenge["cascade"]}
+
 # Solution Routes
 @api_router.post("/solutions", response_model=Solution)
-async def submit_solution(solution_data: SolutionSubmit, current_user: User = Depends(get_current_user)):
-    # Check if challenge exists and is active
-    challenge = await db.challenges.find_one({"id": solution_data.challenge_id})
+async def submit_solution(solution_data: SolutionSubmit, current_user: CurrentUser = Depends(get_current_user)):
+    # Check if challenge exists and is active; the catalog only misses
+    # challenges created by another process since its last reload
+    challenge = challenge_catalog.snapshot.get(solution_data.challenge_id)
+    if not challenge:
+        challenge = await db.challenges.find_one({"id": solution_data.challenge_id, **LIVE_CHALLENGE})
     if not challenge:
         raise HTTPException(status_code=404, detail="Challenge not found")
     
@@ -582,101 +2372,174 @@ async def submit_solution(solution_data: SolutionSubmit, current_user: User = De
     if datetime.utcnow() > challenge["deadline"]:
         raise HTTPException(status_code=400, detail="Challenge deadline has passed")
     
-    # Check if user already submitted
-    existing_solution = await db.solutions.find_one({
-        "challenge_id": solution_data.challenge_id,
-        "user_id": current_user.id
-    })
-    if existing_solution:
-        raise HTTPException(status_code=400, detail="Solution already submitted for this challenge")
+    if not submission_index_ready:
+        existing_solution = await db.solutions.find_one(
+            {"challenge_id": solution_data.challenge_id, "user_id": current_user.id}, {"_id": 1}
+        )
+        if existing_solution:
+            raise HTTPException(status_code=400, detail="Solution already submitted for this challenge")
     
     solution = Solution(
         challenge_id=solution_data.challenge_id,
         user_id=current_user.id,
         content=solution_data.content,
-        files=solution_data.files,
+        files=await store_attachments(solution_data.files, current_user),
         file_names=solution_data.file_names
     )
     
-    await db.solutions.insert_one(solution.dict())
-    
-    # Check and award badges
-    await check_and_award_badges(current_user.id)
+    # Badge checks are queued with the insert and run in the background
+    badges = outbox_entry("award_badges", f"badges:{solution.id}:submitted", user_id=current_user.id)
+    try:
+        # SUBMISSION_INDEX rejects a second solution, even from a concurrent request
+        await db.solutions.insert_one({**solution.dict(), "outbox": [badges]})
+    except DuplicateKeyError:
+        await release_attachments(attachment_ref_counts([solution.dict()]))
+        raise HTTPException(status_code=400, detail="Solution already submitted for this challenge")
+    await collection_versions.bump("solutions")
+    challenge_analytics.invalidate(solution_data.challenge_id)
+    job_queue.notify()
     
     return solution
 
+@api_router.post("/solutions/claim", response_model=List[SolutionResponse])
+async def claim_solutions(
+    count: int = Query(5, ge=1, le=EVALUATION_CLAIM_MAX, description="How many solutions to claim"),
+    challenge_id: Optional[str] = None,
+    admin_user: CurrentUser = Depends(get_admin_user)
+):
+    """Lease the next pending solutions for evaluation by this grader"""
+    solutions = await claim_pending_solutions(admin_user.id, count, challenge_id)
+    challenge_titles = get_challenge_titles({solution["challenge_id"] for solution in solutions})
+    users = await user_cache.get_many(solution["user_id"] for solution in solutions)
+    return fast_json_response([
+        project_document(
+            SolutionResponse,
+            solution,
+            challenge_title=challenge_titles.get(solution["challenge_id"], "Unknown"),
+            user_name=users[solution["user_id"]]["name"] if solution["user_id"] in users else "Unknown"
+        )
+        for solution in solutions
+    ])
+
+@api_router.post("/solutions/{solution_id}/release")
+async def release_solution(solution_id: str, admin_user: CurrentUser = Depends(get_admin_user)):
+    """Give a claimed solution back to the queue before its lease expires"""
+    result = await db.solutions.update_one(
+        {"id": solution_id, "claimed_by": admin_user.id},
+        {"$set": {"claimed_by": None, "claim_expires_at": None}}
+    )
+    if not result.matched_count:
+        raise HTTPException(status_code=404, detail="No claim on this solution")
+    return {"message": "Solution released"}
+
+@api_router.get("/attachments/{digest}")
+async def get_attachment(digest: str, current_user: CurrentUser = Depends(get_current_user)):
+    """Download an attachment by digest; content never changes, so it caches forever"""
+    if not await can_read_attachments(current_user, [digest]):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    attachment = await db.attachments.find_one({"_id": digest, "refcount": {"$gt": 0}})
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return Response(
+        content=bytes(attachment["data"]),
+        media_type="application/octet-stream",
+        headers={"ETag": f'"{digest}"', "Cache-Control": "private, max-age=31536000, immutable"}
+    )
+
 @api_router.get("/solutions", response_model=List[SolutionResponse])
-async def get_solutions(admin_user: User = Depends(get_admin_user)):
-    solutions = await db.solutions.find().to_list(1000)
+async def get_solutions(
+    fields: Optional[str] = FIELDS_QUERY,
+    admin_user: CurrentUser = Depends(get_admin_user)
+):
+    selected_fields = parse_fields("solutions", fields)
+    solutions = await db.solutions.find(
+        {}, field_projection(selected_fields, "challenge_id", "user_id")
+    ).to_list(1000)
+    
+    # Get challenge and user info in one query each
+    challenge_titles = get_challenge_titles({solution["challenge_id"] for solution in solutions})
+    user_names = {}
+    if selected(selected_fields, "user_name"):
+        users = await user_cache.get_many(solution["user_id"] for solution in solutions)
+        user_names = {user_id: user["name"] for user_id, user in users.items()}
     
     solution_responses = []
     for solution in solutions:
-        # Get challenge and user info
-        challenge = await db.challenges.find_one({"id": solution["challenge_id"]})
-        user = await db.users.find_one({"id": solution["user_id"]})
-        
-        solution_response = SolutionResponse(
-            **solution,
-            challenge_title=challenge["title"] if challenge else "Unknown",
-            user_name=user["name"] if user else "Unknown"
+        solution_response = project_document(
+            SolutionResponse,
+            solution,
+            selected_fields,
+            challenge_title=challenge_titles.get(solution["challenge_id"], "Unknown"),
+            user_name=user_names.get(solution["user_id"], "Unknown")
         )
         solution_responses.append(solution_response)
     
-    return solution_responses
+    return fast_json_response(solution_responses)
 
 @api_router.get("/solutions/my", response_model=List[SolutionResponse])
-async def get_my_solutions(current_user: User = Depends(get_current_user)):
-    solutions = await db.solutions.find({"user_id": current_user.id}).to_list(1000)
-    
-    solution_responses = []
-    for solution in solutions:
-        # Get challenge info
-        challenge = await db.challenges.find_one({"id": solution["challenge_id"]})
-        
-        solution_response = SolutionResponse(
-            **solution,
-            challenge_title=challenge["title"] if challenge else "Unknown",
-            user_name=current_user.name
-        )
-        solution_responses.append(solution_response)
-    
-    return solution_responses
+async def get_my_solutions(
+    fields: Optional[str] = FIELDS_QUERY,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    selected_fields = parse_fields("solutions", fields)
+    solutions = await db.solutions.find(
+        {"user_id": current_user.id}, field_projection(selected_fields, "challenge_id")
+    ).to_list(1000)
+    user = await user_cache.get(current_user.id) if selected(selected_fields, "user_name") else None
+    return fast_json_response(my_solution_items(solutions, user, selected_fields))
 
 @api_router.put("/solutions/evaluate")
-async def evaluate_solution(evaluation: SolutionEvaluate, admin_user: User = Depends(get_admin_user)):
+async def evaluate_solution(evaluation: SolutionEvaluate, admin_user: CurrentUser = Depends(get_admin_user)):
     solution = await db.solutions.find_one({"id": evaluation.solution_id})
     if not solution:
         raise HTTPException(status_code=404, detail="Solution not found")
     
-    # Update solution with evaluation
-    await db.solutions.update_one(
-        {"id": evaluation.solution_id},
+    # Update solution with evaluation; the notification and badge check
+    # are queued in the same update and run in the background
+    evaluated_at = datetime.utcnow()
+    jobs = [
+        outbox_entry(
+            "notify",
+            f"evaluation:{evaluation.solution_id}:{evaluated_at.isoformat()}",
+            user_id=solution["user_id"],
+            title="Solução Avaliada! 📝",
+            message=f"Sua solução foi avaliada e recebeu {evaluation.score} pontos. Feedback: {evaluation.feedback[:100]}...",
+            notification_type="evaluation",
+            challenge_id=solution["challenge_id"]
+        ),
+        outbox_entry("award_badges", f"badges:{evaluation.solution_id}:{evaluated_at.isoformat()}", user_id=solution["user_id"])
+    ]
+    result = await db.solutions.update_one(
+        {"id": evaluation.solution_id, **claimable_by(admin_user.id, evaluated_at)},
         {
             "$set": {
                 "score": evaluation.score,
                 "feedback": evaluation.feedback,
                 "evaluated_by": admin_user.id,
-                "evaluated_at": datetime.utcnow()
-            }
+                "evaluated_at": evaluated_at,
+                "claimed_by": None,
+                "claim_expires_at": None
+            },
+            "$push": {"outbox": {"$each": jobs}}
         }
     )
-    
-    # Update user points
-    await db.users.update_one(
-        {"id": solution["user_id"]},
-        {"$inc": {"points": evaluation.score}}
-    )
-    
-    # Create notification for user
-    await create_notification(
-        solution["user_id"],
-        "Solução Avaliada! 📝",
-        f"Sua solução foi avaliada e recebeu {evaluation.score} pontos. Feedback: {evaluation.feedback[:100]}...",
-        "evaluation"
-    )
-    
-    # Check and award badges after evaluation
-    await check_and_award_badges(solution["user_id"])
+    if not result.matched_count:
+        raise HTTPException(status_code=409, detail="Solution is claimed by another evaluator")
+    challenge_analytics.invalidate(solution["challenge_id"])
+    
+    # Update user points through the ledger
+    challenge = challenge_catalog.snapshot.get(solution["challenge_id"])
+    await record_points(PointsEntry(
+        user_id=solution["user_id"],
+        points=evaluation.score,
+        reason="evaluation",
+        solution_id=evaluation.solution_id,
+        challenge_id=solution["challenge_id"],
+        category=challenge["category"] if challenge else None,
+        created_at=evaluated_at
+    ))
+    await collection_versions.bump("solutions")
+    job_queue.notify()
     
     return {"message": "Solution evaluated successfully"}
 
@@ -684,58 +2547,59 @@ async def evaluate_solution(evaluation: SolutionEvaluate, admin_user: User = Dep
 @api_router.get("/search", response_model=SearchResult)
 async def search(
     q: str = Query(..., description="Search query"),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    # Search challenges
-    challenge_filter = {
-        "status": ChallengeStatus.ACTIVE,
-        "$or": [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"description": {"$regex": q, "$options": "i"}},
-            {"tags": {"$in": [re.compile(q, re.IGNORECASE)]}}
-        ]
-    }
-    challenges = await db.challenges.find(challenge_filter).to_list(50)
-    
-    # Get user's submitted challenges
-    user_solutions = await db.solutions.find({"user_id": current_user.id}).to_list(1000)
-    submitted_challenge_ids = [sol["challenge_id"] for sol in user_solutions]
-    
-    challenge_responses = []
-    for challenge in challenges:
-        challenge_response = ChallengeResponse(
-            **challenge,
-            user_submitted=challenge["id"] in submitted_challenge_ids,
-            can_submit=datetime.utcnow() < challenge["deadline"] and challenge["id"] not in submitted_challenge_ids
-        )
-        challenge_responses.append(challenge_response)
+    # Ranked active challenges, cached per normalized query and catalog version
+    catalog = challenge_catalog.snapshot
+    challenge_ids = search_cache.get(catalog, normalize_search_query(q))
+    challenges = [catalog.get(challenge_id) for challenge_id in challenge_ids]
+    
+    # Only the user's own flags are computed per request
+    submitted_challenge_ids = set()
+    if challenge_ids:
+        user_solutions = await db.solutions.find(
+            {"user_id": current_user.id, "challenge_id": {"$in": challenge_ids}}, {"challenge_id": 1}
+        ).to_list(None)
+        submitted_challenge_ids = {sol["challenge_id"] for sol in user_solutions}
+    challenge_responses = challenge_items(catalog, challenges, submitted_challenge_ids)
     
     # Search users (admin only)
     users = []
-    if current_user.role == UserRole.ADMIN:
-        user_filter = {
-            "$or": [
-                {"name": {"$regex": q, "$options": "i"}},
-                {"email": {"$regex": q, "$options": "i"}}
-            ]
-        }
-        user_docs = await db.users.find(user_filter).to_list(20)
-        users = [UserProfile(**user) for user in user_docs]
-    
-    return SearchResult(
-        challenges=challenge_responses,
-        users=users,
-        total_results=len(challenge_responses) + len(users)
-    )
+    user_filter = user_search_filter(q)
+    if current_user.is_admin and user_filter:
+        user_docs = await db.users.find(user_filter, USER_PRIVATE_FIELDS).to_list(USER_SEARCH_RESULTS_MAX)
+        users = [project_document(UserProfile, user) for user in user_docs]
+    
+    return fast_json_response({
+        "challenges": challenge_responses,
+        "users": users,
+        "total_results": len(challenge_responses) + len(users)
+    })
 
 # Notification Routes
 @api_router.get("/notifications", response_model=List[NotificationResponse])
-async def get_notifications(current_user: User = Depends(get_current_user)):
-    notifications = await db.notifications.find({"user_id": current_user.id}).sort("created_at", -1).limit(50).to_list(50)
-    return [NotificationResponse(**notification) for notification in notifications]
+async def get_notifications(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = FIELDS_QUERY,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    selected_fields = parse_fields("notifications", fields)
+    etag = collection_versions.etag(["notifications"], "notifications", current_user.id, selected_fields)
+    not_modified = conditional_response(request, response, etag, "private, no-cache")
+    if not_modified:
+        return not_modified
+    
+    notifications = await db.notifications.find(
+        {"user_id": current_user.id}, field_projection(selected_fields)
+    ).sort("created_at", -1).limit(50).to_list(50)
+    return fast_json_response(
+        [project_document(NotificationResponse, notification, selected_fields) for notification in notifications],
+        response
+    )
 
 @api_router.put("/notifications/{notification_id}/read")
-async def mark_notification_read(notification_id: str, current_user: User = Depends(get_current_user)):
+async def mark_notification_read(notification_id: str, current_user: CurrentUser = Depends(get_current_user)):
     notification = await db.notifications.find_one({"id": notification_id, "user_id": current_user.id})
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
@@ -744,33 +2608,37 @@ async def mark_notification_read(notification_id: str, current_user: User = Depe
         {"id": notification_id},
         {"$set": {"read": True}}
     )
+    await collection_versions.bump("notifications")
     return {"message": "Notification marked as read"}
 
 @api_router.put("/notifications/mark-all-read")
-async def mark_all_notifications_read(current_user: User = Depends(get_current_user)):
+async def mark_all_notifications_read(current_user: CurrentUser = Depends(get_current_user)):
     await db.notifications.update_many(
         {"user_id": current_user.id, "read": False},
         {"$set": {"read": True}}
     )
+    await collection_versions.bump("notifications")
     return {"message": "All notifications marked as read"}
 
 # User Management (Admin)
 @api_router.get("/admin/users", response_model=List[UserManagement])
-async def get_all_users(admin_user: User = Depends(get_admin_user)):
-    users = await db.users.find().to_list(1000)
-    return [UserManagement(**user) for user in users]
+async def get_all_users(
+    fields: Optional[str] = FIELDS_QUERY,
+    admin_user: CurrentUser = Depends(get_admin_user)
+):
+    selected_fields = parse_fields("users", fields)
+    projection = field_projection(selected_fields) or USER_PRIVATE_FIELDS
+    users = await db.users.find({}, projection).to_list(1000)
+    return fast_json_response([project_document(UserManagement, user, selected_fields) for user in users])
 
 @api_router.put("/admin/users/{user_id}/toggle-active")
-async def toggle_user_active(user_id: str, admin_user: User = Depends(get_admin_user)):
+async def toggle_user_active(user_id: str, admin_user: CurrentUser = Depends(get_admin_user)):
     user = await db.users.find_one({"id": user_id})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     new_status = not user["is_active"]
-    await db.users.update_one(
-        {"id": user_id},
-        {"$set": {"is_active": new_status}}
-    )
+    await update_user_and_revoke_tokens(user_id, {"$set": {"is_active": new_status}})
     
     # Notify user of status change
     status_text = "ativada" if new_status else "desativada"
@@ -783,30 +2651,116 @@ async def toggle_user_active(user_id: str, admin_user: User = Depends(get_admin_
     
     return {"message": f"User {'activated' if new_status else 'deactivated'} successfully"}
 
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats(admin_user: CurrentUser = Depends(get_admin_user)):
+    return {
+        "user_profiles": user_cache.stats(),
+        "hot_reads": hot_reads.stats(),
+        "search_results": search_cache.stats()
+    }
+
 # Leaderboard Route
 @api_router.get("/leaderboard", response_model=List[LeaderboardEntry])
-async def get_leaderboard():
-    users = await db.users.find({"is_active": True}).sort("points", -1).limit(50).to_list(50)
-    
-    leaderboard = []
-    for i, user in enumerate(users):
-        entry = LeaderboardEntry(
-            user_id=user["id"],
-            name=user["name"],
-            points=user["points"],
-            badges=user["badges"],
-            rank=i + 1
-        )
-        leaderboard.append(entry)
+async def get_leaderboard(
+    request: Request,
+    response: Response,
+    window: LeaderboardWindow = LeaderboardWindow.ALL,
+    category: Optional[ChallengeCategory] = None
+):
+    category_key = category.value if category else ALL_CATEGORIES
+    bucket = window_buckets(datetime.utcnow())[window.value]
+    etag = collection_versions.etag(["users", "points"], "leaderboard", window.value, bucket, category_key)
+    not_modified = conditional_response(
+        request, response, etag, f"public, max-age={LEADERBOARD_CACHE_SECONDS}"
+    )
+    if not_modified:
+        return not_modified
     
-    return leaderboard
+    if window == LeaderboardWindow.ALL and category is None:
+        return leaderboard_items(await leaderboard_users())
+    return leaderboard_items(await windowed_leaderboard_users(window.value, category_key))
+
+@api_router.get("/leaderboard/me", response_model=LeaderboardPosition)
+async def get_my_leaderboard_position(
+    k: int = Query(5, ge=0, le=LEADERBOARD_NEIGHBORS_MAX, description="Neighbors on each side"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await get_leaderboard_around(current_user.id, k)
+
+@api_router.get("/leaderboard/around/{user_id}", response_model=LeaderboardPosition)
+async def get_leaderboard_around(
+    user_id: str,
+    k: int = Query(5, ge=0, le=LEADERBOARD_NEIGHBORS_MAX, description="Neighbors on each side")
+):
+    user = await user_cache.get(user_id)
+    if not user or not user.get("is_active", True):
+        raise HTTPException(status_code=404, detail="User not found on leaderboard")
+    return await leaderboard_neighborhood(user, k)
+
+# Student Dashboard
+@api_router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(current_user: CurrentUser = Depends(get_current_user)):
+    """Everything the dashboard renders on load, authenticated once and
+    fetched concurrently instead of over five requests"""
+    user, solutions, notifications, unread, top_users = await asyncio.gather(
+        user_cache.get(current_user.id),
+        db.solutions.find({"user_id": current_user.id}).to_list(1000),
+        db.notifications.find({"user_id": current_user.id}).sort("created_at", -1).limit(50).to_list(50),
+        db.notifications.count_documents({"user_id": current_user.id, "read": False}),
+        leaderboard_users()
+    )
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Rank is free when the user is on the leaderboard page already
+    rank = next((i + 1 for i, entry in enumerate(top_users) if entry["id"] == current_user.id), None)
+    if rank is None:
+        rank = await leaderboard_rank(user)
+    
+    profile = project_document(UserProfile, user)
+    pending_login = last_login_buffer.latest(current_user.id)
+    if pending_login:
+        profile["last_login"] = pending_login
+    
+    catalog = challenge_catalog.snapshot
+    active_challenges = catalog.filter(status=ChallengeStatus.ACTIVE.value)[:1000]
+    submitted_challenge_ids = {solution["challenge_id"] for solution in solutions}
+    
+    return fast_json_response({
+        "profile": profile,
+        "rank": rank,
+        "unread_notifications": unread,
+        "challenges": challenge_items(catalog, active_challenges, submitted_challenge_ids),
+        "my_solutions": my_solution_items(solutions, user),
+        "notifications": [project_document(NotificationResponse, notification) for notification in notifications],
+        "leaderboard": leaderboard_items(top_users)
+    })
+
+# Challenge Analytics (Admin)
+@api_router.get("/admin/challenges/analytics", response_model=List[ChallengeAnalytics])
+async def get_catalog_analytics(
+    status: Optional[ChallengeStatus] = None,
+    admin_user: CurrentUser = Depends(get_admin_user)
+):
+    catalog = challenge_catalog.snapshot
+    challenges = catalog.by_status.get(status.value, []) if status else list(catalog.challenges.values())
+    tables = await challenge_analytics.tables([challenge["id"] for challenge in challenges])
+    return fast_json_response([summarize_scores(challenge, tables[challenge["id"]]) for challenge in challenges])
+
+@api_router.get("/admin/challenges/{challenge_id}/analytics", response_model=ChallengeAnalytics)
+async def get_challenge_analytics(challenge_id: str, admin_user: CurrentUser = Depends(get_admin_user)):
+    challenge = challenge_catalog.snapshot.get(challenge_id)
+    if not challenge:
+        raise HTTPException(status_code=404, detail="Challenge not found")
+    tables = await challenge_analytics.tables([challenge_id])
+    return fast_json_response(summarize_scores(challenge, tables[challenge_id]))
 
 # Dashboard Stats (Admin)
 @api_router.get("/admin/stats")
-async def get_admin_stats(admin_user: User = Depends(get_admin_user)):
+async def get_admin_stats(admin_user: CurrentUser = Depends(get_admin_user)):
     total_users = await db.users.count_documents({"is_active": True})
-    total_challenges = await db.challenges.count_documents({})
-    active_challenges = await db.challenges.count_documents({"status": ChallengeStatus.ACTIVE})
+    total_challenges = await db.challenges.count_documents(LIVE_CHALLENGE)
+    active_challenges = await db.challenges.count_documents({"status": ChallengeStatus.ACTIVE, **LIVE_CHALLENGE})
     total_solutions = await db.solutions.count_documents({})
     evaluated_solutions = await db.solutions.count_documents({"score": {"$ne": None}})
     
@@ -832,6 +2786,87 @@ async def get_admin_stats(admin_user: User = Depends(get_admin_user)):
         "recent_registrations_count": len(recent_registrations)
     }
 
+# Batch Route
+BATCH_METHODS = {"GET", "POST", "PUT", "DELETE"}
+
+async def dispatch_sub_request(request: Request, principal: CurrentUser, item: BatchItem) -> BatchItemResult:
+    """Run one batch item through the ASGI app in-process, carrying the
+    already authenticated principal instead of re-validating the token"""
+    method = item.method.upper()
+    path, _, query = item.path.partition("?")
+    if method not in BATCH_METHODS or not path.startswith("/api/") or path.rstrip("/") == "/api/batch":
+        return BatchItemResult(status=400, body={"detail": "Unsupported batch item"})
+    
+    headers = [(b"authorization", request.headers["authorization"].encode("latin-1"))]
+    body = b""
+    if item.body is not None:
+        body = json.dumps(item.body).encode("utf-8")
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": request.url.scheme,
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "root_path": "",
+        "query_string": query.encode("utf-8"),
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "state": {"principal": principal},
+    }
+    
+    body_sent = False
+    async def receive():
+        nonlocal body_sent
+        if body_sent:
+            return {"type": "http.disconnect"}
+        body_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+    
+    status_code = 500
+    chunks = []
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+    
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # The error middleware has already logged it and sent a 500
+        logger.exception("Batch item %s %s failed", method, path)
+        return BatchItemResult(status=500, body={"detail": "Internal Server Error"})
+    
+    raw = b"".join(chunks)
+    try:
+        content = json.loads(raw) if raw else None
+    except ValueError:
+        content = raw.decode("utf-8", "replace")
+    return BatchItemResult(status=status_code, body=content)
+
+@api_router.post("/batch", response_model=List[BatchItemResult])
+async def batch(request: Request, batch_request: BatchRequest, current_user: CurrentUser = Depends(get_current_user)):
+    """Run several API calls in one round trip. Items execute concurrently
+    (at most BATCH_CONCURRENCY at a time), so callers must not rely on
+    ordering between them; results come back in request order."""
+    if len(batch_request.requests) > BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds the maximum of {BATCH_MAX_SIZE} requests"
+        )
+    
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    async def run(item: BatchItem) -> BatchItemResult:
+        async with semaphore:
+            return await dispatch_sub_request(request, current_user, item)
+    
+    return await asyncio.gather(*(run(item) for item in batch_request.requests))
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -850,6 +2885,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+periodic_tasks: List[asyncio.Task] = []
+
+@app.on_event("startup")
+async def start_background_tasks():
+    user_cache.clear()
+    hot_reads.clear()
+    auth_epochs.clear()
+    collection_versions.clear()
+    await collection_versions.load()
+    challenge_analytics.clear()
+    search_cache.clear()
+    await ensure_indexes()
+    await load_auth_epochs()
+    await challenge_catalog.load()
+    periodic_tasks.extend([
+        asyncio.create_task(run_periodically(AUTH_EPOCH_REFRESH_SECONDS, load_auth_epochs, "auth epochs")),
+        asyncio.create_task(run_periodically(VERSION_REFRESH_SECONDS, collection_versions.load, "collection versions")),
+        asyncio.create_task(run_periodically(SUBMISSION_INDEX_RETRY_SECONDS, ensure_submission_index, "submission index")),
+        asyncio.create_task(run_periodically(CATALOG_REFRESH_SECONDS, challenge_catalog.load, "challenge catalog")),
+        asyncio.create_task(run_periodically(ATTACHMENT_GC_SECONDS, collect_attachments, "attachment collection"))
+    ])
+    last_login_buffer.start()
+    await deadline_scheduler.start()
+    job_queue.start(JOB_WORKERS)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    while periodic_tasks:
+        periodic_tasks.pop().cancel()
+    deadline_scheduler.stop()
+    job_queue.stop()
+    # Write buffered logins before the connection goes away
+    await last_login_buffer.stop()
     client.close()
\ No newline at end of file
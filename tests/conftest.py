@@ -0,0 +1,250 @@
+"""
+Shared fixtures for the backend test suite.
+
+The API runs in-process against an in-memory MongoDB stand-in
+(mongomock-motor), wrapped so every database operation issued while
+handling a request is counted.
+"""
+
+import asyncio
+import hashlib
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import server  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+TEST_PASSWORD = "TestPass123!"
+# bcrypt is slow on purpose; hash once for every seeded account
+TEST_PASSWORD_HASH = server.hash_password(TEST_PASSWORD)
+
+# Collection methods that cost a database round trip
+DB_OPERATIONS = {
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many",
+    "replace_one", "delete_one", "delete_many", "count_documents", "aggregate",
+    "distinct", "bulk_write", "find_one_and_update", "find_one_and_delete",
+    "find_one_and_replace", "estimated_document_count",
+}
+
+
+class OperationLog:
+    """Records database operations as (collection, operation) pairs"""
+
+    def __init__(self):
+        self.calls = []
+
+    def reset(self):
+        self.calls = []
+
+    @property
+    def count(self):
+        return len(self.calls)
+
+
+class CountingCollection:
+    def __init__(self, collection, log: OperationLog):
+        self._collection = collection
+        self._log = log
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in DB_OPERATIONS:
+            return attr
+
+        def counted(*args, **kwargs):
+            self._log.calls.append((self._collection.name, name))
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+class CountingDatabase:
+    def __init__(self, database, log: OperationLog):
+        self._database = database
+        self._log = log
+
+    def __getattr__(self, name):
+        attr = getattr(self._database, name)
+        if hasattr(attr, "find_one"):
+            return CountingCollection(attr, self._log)
+        return attr
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name], self._log)
+
+
+class SeededApp:
+    """A TestClient bound to a database seeded at a given size"""
+
+    def __init__(self, client: TestClient, log: OperationLog, database, documents: dict, ids: dict):
+        self.client = client
+        self.log = log
+        self.database = database
+        self.documents = documents
+        self.ids = ids
+
+    def user(self, key: str) -> dict:
+        return next(user for user in self.documents["users"] if user["id"] == self.ids[key])
+
+    def headers(self, key: str):
+        return {"Authorization": f"Bearer {server.create_user_token(self.user(key))}"}
+
+    def run_jobs(self) -> int:
+        """Process queued background jobs now; returns how many ran"""
+        return self.client.portal.call(server.job_queue.run_pending)
+
+
+def build_dataset(size: int):
+    """Documents for one admin, one student and `size` of everything else"""
+    now = datetime.utcnow()
+
+    def user(name, role, points=0):
+        document = server.User(
+            email=f"{name.lower()}.{uuid.uuid4().hex[:8]}@pucrs.edu.br",
+            name=name,
+            password_hash=TEST_PASSWORD_HASH,
+            role=role,
+            points=points,
+            last_login=now,
+        ).dict()
+        document["search_keys"] = server.user_search_keys(document["name"], document["email"])
+        return document
+
+    admin = user("Admin", server.UserRole.ADMIN)
+    student = user("Student", server.UserRole.STUDENT, points=10 * size)
+    others = [user(f"Other{i}", server.UserRole.STUDENT, points=i) for i in range(size)]
+
+    def challenge(title, category=server.ChallengeCategory.TECHNOLOGY):
+        return server.Challenge(
+            title=title,
+            description=f"Descrição de {title}",
+            category=category,
+            difficulty=server.DifficultyLevel.BEGINNER,
+            deadline=now + timedelta(days=7),
+            criteria="Impacto",
+            points_reward=100,
+            created_by=admin["id"],
+            tags=["inovacao"],
+        ).dict()
+
+    challenges = [challenge(f"Desafio {i}") for i in range(size)]
+    open_challenge = challenge("Desafio aberto")
+    deletable_challenge = challenge("Desafio descartável")
+    deleted_challenge = challenge("Desafio excluído")
+    deleted_challenge.update(
+        deleted_at=now, cascade={"solutions_archived": 3, "notifications_deleted": 0, "done": True}
+    )
+
+    # Every one of the student's solutions attaches the same report
+    report = b"relatorio"
+    attachment = {"_id": hashlib.sha256(report).hexdigest(), "data": report, "size": len(report),
+                  "refcount": size, "created_at": now}
+    solutions = []
+    for i, (owner, target) in enumerate(zip([student] * size, challenges)):
+        solutions.append(server.Solution(
+            challenge_id=target["id"],
+            user_id=owner["id"],
+            content=f"Solução {i}",
+            files=[server.ATTACHMENT_REF_PREFIX + attachment["_id"]],
+            file_names=["relatorio.txt"],
+            score=90 if i % 2 else None,
+        ).dict())
+    for other, target in zip(others, challenges):
+        solutions.append(server.Solution(
+            challenge_id=target["id"], user_id=other["id"], content="Outra solução"
+        ).dict())
+    pending = next(s for s in solutions if s["score"] is None)
+    # The admin is grading the newest submission
+    claimed = solutions[-1]
+    claimed.update(claimed_by=admin["id"], claim_expires_at=now + timedelta(minutes=10))
+
+    notifications = [
+        server.Notification(
+            user_id=student["id"], title=f"Aviso {i}", message="Mensagem", type="system"
+        ).dict()
+        for i in range(size)
+    ]
+
+    # Every user's points are explained by the ledger, earned in technology today
+    ledger = [
+        server.PointsEntry(user_id=owner["id"], points=owner["points"], reason="evaluation",
+                           category="technology").dict()
+        for owner in [student] + others if owner["points"]
+    ]
+    rollups = [
+        {"_id": server.rollup_key(*key), "window": key[0], "bucket": key[1], "category": key[2],
+         "user_id": key[3], "points": points}
+        for key, points in server.rollup_increments(ledger).items()
+    ]
+
+    documents = {
+        "users": [admin, student] + others,
+        "challenges": challenges + [open_challenge, deletable_challenge, deleted_challenge],
+        "solutions": solutions,
+        "notifications": notifications,
+        "points_ledger": ledger,
+        "points_rollups": rollups,
+        "attachments": [attachment],
+    }
+    ids = {
+        "admin": admin["id"],
+        "student": student["id"],
+        "student_email": student["email"],
+        "other_user": others[0]["id"],
+        "challenge": challenges[0]["id"],
+        "open_challenge": open_challenge["id"],
+        "deletable_challenge": deletable_challenge["id"],
+        "deleted_challenge": deleted_challenge["id"],
+        "pending_solution": pending["id"],
+        "claimed_solution": claimed["id"],
+        "notification": notifications[0]["id"],
+        "attachment": attachment["_id"],
+    }
+    return documents, ids
+
+
+@pytest.fixture
+def seeded_app(monkeypatch):
+    """Factory: seeded_app(size) -> SeededApp with operation counting enabled"""
+    clients = []
+
+    def close_clients():
+        while clients:
+            clients.pop().__exit__(None, None, None)
+
+    def factory(size: int) -> SeededApp:
+        close_clients()
+        database = mongomock_motor.AsyncMongoMockClient()[f"test_{uuid.uuid4().hex}"]
+        documents, ids = build_dataset(size)
+
+        async def seed():
+            for name, docs in documents.items():
+                if docs:
+                    await database[name].insert_many(docs)
+
+        asyncio.run(seed())
+
+        log = OperationLog()
+        monkeypatch.setattr(server, "db", CountingDatabase(database, log))
+        # Jobs run only when a test asks, so they never land in a request's count
+        monkeypatch.setattr(server, "JOB_WORKERS", 0)
+        client = TestClient(server.app)
+        client.__enter__()
+        clients.append(client)
+        log.reset()
+        return SeededApp(client, log, database, documents, ids)
+
+    yield factory
+
+    close_clients()
@@ -0,0 +1,142 @@
+"""Content-addressed solution attachments with reference counting."""
+
+import base64
+import hashlib
+from datetime import datetime, timedelta
+
+from tests.conftest import server
+
+
+def submit(app, *files):
+    return app.client.post("/api/solutions", headers=app.headers("student"), json={
+        "challenge_id": app.ids["open_challenge"],
+        "content": "Minha solução",
+        "files": list(files),
+        "file_names": [f"anexo_{i}.txt" for i in range(len(files))],
+    })
+
+
+def attachment(app, digest):
+    return app.client.portal.call(server.db.attachments.find_one, {"_id": digest})
+
+
+def test_upload_is_stored_once_per_digest(seeded_app):
+    app = seeded_app(3)
+    data = b"planilha de custos"
+    digest = hashlib.sha256(data).hexdigest()
+    encoded = base64.b64encode(data).decode("ascii")
+
+    response = submit(app, encoded, encoded)
+
+    assert response.status_code == 200
+    assert response.json()["files"] == [server.ATTACHMENT_REF_PREFIX + digest] * 2
+    stored = attachment(app, digest)
+    assert stored["data"] == data
+    assert stored["refcount"] == 2
+
+
+def test_existing_digest_is_not_stored_again(seeded_app):
+    app = seeded_app(3)
+    report = base64.b64encode(b"relatorio").decode("ascii")
+    app.log.reset()
+
+    response = submit(app, report)
+
+    assert response.status_code == 200
+    assert response.json()["files"] == [server.ATTACHMENT_REF_PREFIX + app.ids["attachment"]]
+    assert attachment(app, app.ids["attachment"])["refcount"] == 4
+    assert ("attachments", "bulk_write") in app.log.calls
+
+
+def test_refs_can_be_reused_without_uploading(seeded_app):
+    app = seeded_app(3)
+
+    response = submit(app, server.ATTACHMENT_REF_PREFIX + app.ids["attachment"])
+
+    assert response.status_code == 200
+    assert attachment(app, app.ids["attachment"])["refcount"] == 4
+
+
+def test_unknown_ref_and_invalid_base64_are_rejected(seeded_app):
+    app = seeded_app(3)
+
+    assert submit(app, server.ATTACHMENT_REF_PREFIX + "0" * 64).status_code == 400
+    assert submit(app, "não é base64").status_code == 400
+    assert app.client.portal.call(server.db.solutions.count_documents, {"challenge_id": app.ids["open_challenge"]}) == 0
+
+
+def test_download_is_immutable(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.get(f"/api/attachments/{app.ids['attachment']}", headers=app.headers("student"))
+
+    assert response.status_code == 200
+    assert response.content == b"relatorio"
+    assert response.headers["ETag"] == f'"{app.ids["attachment"]}"'
+    assert "immutable" in response.headers["Cache-Control"]
+    assert app.client.get("/api/attachments/missing", headers=app.headers("student")).status_code == 404
+
+
+def test_deleting_challenges_releases_and_collects_attachments(seeded_app):
+    app = seeded_app(3)
+    for challenge in app.documents["challenges"][:3]:
+        app.client.delete(f"/api/challenges/{challenge['id']}", headers=app.headers("admin"))
+    app.run_jobs()
+
+    assert attachment(app, app.ids["attachment"])["refcount"] == 0
+    # Still within the grace period
+    assert app.client.portal.call(server.collect_attachments) == 0
+
+    app.client.portal.call(
+        server.db.attachments.update_one,
+        {"_id": app.ids["attachment"]},
+        {"$set": {"released_at": datetime.utcnow() - server.ATTACHMENT_GC_GRACE - timedelta(minutes=1)}}
+    )
+    assert app.client.portal.call(server.collect_attachments) == 1
+    assert attachment(app, app.ids["attachment"]) is None
+
+
+def test_refs_to_collectable_attachments_are_rejected(seeded_app):
+    app = seeded_app(3)
+    released = datetime.utcnow() - server.ATTACHMENT_GC_GRACE - timedelta(minutes=1)
+    app.client.portal.call(
+        server.db.attachments.update_one,
+        {"_id": app.ids["attachment"]},
+        {"$set": {"refcount": 0, "released_at": released}}
+    )
+
+    assert submit(app, server.ATTACHMENT_REF_PREFIX + app.ids["attachment"]).status_code == 400
+
+
+def test_upload_recreates_an_attachment_collected_meanwhile(seeded_app):
+    app = seeded_app(3)
+    app.client.portal.call(server.db.attachments.delete_one, {"_id": app.ids["attachment"]})
+
+    response = submit(app, base64.b64encode(b"relatorio").decode("ascii"))
+
+    assert response.status_code == 200
+    stored = attachment(app, app.ids["attachment"])
+    assert (stored["data"], stored["refcount"]) == (b"relatorio", 1)
+
+
+def test_only_owners_and_admins_can_download(seeded_app):
+    app = seeded_app(3)
+    url = f"/api/attachments/{app.ids['attachment']}"
+
+    assert app.client.get(url, headers=app.headers("other_user")).status_code == 404
+    assert app.client.get(url, headers=app.headers("admin")).content == b"relatorio"
+
+
+def test_refs_to_other_users_attachments_are_rejected(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.post("/api/solutions", headers=app.headers("other_user"), json={
+        "challenge_id": app.ids["open_challenge"],
+        "content": "Solução alheia",
+        "files": [server.ATTACHMENT_REF_PREFIX + app.ids["attachment"]],
+        "file_names": ["relatorio.txt"],
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown attachment reference"
+    assert attachment(app, app.ids["attachment"])["refcount"] == 3
@@ -0,0 +1,88 @@
+"""Stateless JWT authentication and revocation epochs."""
+
+from tests.conftest import TEST_PASSWORD, server
+
+
+def test_authentication_does_not_read_the_database(seeded_app):
+    app = seeded_app(3)
+    app.log.reset()
+
+    response = app.client.get("/api/admin/users", headers=app.headers("admin"))
+
+    assert response.status_code == 200
+    assert app.log.calls == [("users", "find")]
+
+
+def test_student_token_cannot_reach_admin_routes(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.get("/api/admin/users", headers=app.headers("student"))
+
+    assert response.status_code == 403
+
+
+def test_toggle_active_revokes_existing_tokens(seeded_app):
+    app = seeded_app(3)
+    student_headers = app.headers("student")
+    assert app.client.get("/api/notifications", headers=student_headers).status_code == 200
+
+    response = app.client.put(
+        f"/api/admin/users/{app.ids['student']}/toggle-active", headers=app.headers("admin")
+    )
+    assert response.status_code == 200
+
+    response = app.client.get("/api/notifications", headers=student_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revoked"
+
+
+def test_token_without_claims_is_rejected(seeded_app):
+    app = seeded_app(3)
+    legacy_token = server.create_access_token(data={"sub": app.ids["student"]})
+
+    response = app.client.get("/api/me", headers={"Authorization": f"Bearer {legacy_token}"})
+
+    assert response.status_code == 401
+
+
+def test_login_token_carries_current_epoch(seeded_app):
+    app = seeded_app(3)
+    app.client.put(f"/api/admin/users/{app.ids['student']}/toggle-active", headers=app.headers("admin"))
+    app.client.put(f"/api/admin/users/{app.ids['student']}/toggle-active", headers=app.headers("admin"))
+
+    response = app.client.post(
+        "/api/login", json={"email": app.ids["student_email"], "password": TEST_PASSWORD}
+    )
+    token = response.json()["access_token"]
+
+    response = app.client.get("/api/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["id"] == app.ids["student"]
+
+
+def test_principal_is_slotted():
+    principal = server.CurrentUser("u1", server.UserRole.STUDENT)
+
+    assert not hasattr(principal, "__dict__")
+    assert not principal.is_admin
+
+
+def test_unknown_role_claim_is_rejected(seeded_app):
+    app = seeded_app(3)
+    token = server.create_access_token(data={"sub": app.ids["student"], "role": "root", "epoch": 0})
+
+    response = app.client.get("/api/notifications", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 401
+
+
+def test_epoch_reload_never_undoes_a_newer_revocation(seeded_app):
+    app = seeded_app(3)
+    student_headers = app.headers("student")
+    # Revoked in this process after a periodic reload had already read the old epoch
+    server.auth_epochs[app.ids["student"]] = 1
+
+    app.client.portal.call(server.load_auth_epochs)
+
+    assert server.auth_epochs[app.ids["student"]] == 1
+    assert app.client.get("/api/notifications", headers=student_headers).status_code == 401
@@ -0,0 +1,75 @@
+"""Declarative badge rules compiled into one aggregation."""
+
+import asyncio
+
+from tests.conftest import server
+
+
+def candidates(app, match=None, rules=None):
+    async def collect():
+        return {user_id: badges async for user_id, badges in server.badge_candidates(match, rules)}
+    return app.client.portal.call(collect)
+
+
+def test_eligibility_for_all_users_in_one_aggregation(seeded_app):
+    app = seeded_app(3)
+    app.log.reset()
+
+    eligible = candidates(app)
+
+    assert app.log.calls == [("solutions", "aggregate")]
+    assert eligible[app.ids["student"]] == ["first_submission", "quick_solver"]
+    others = [user["id"] for user in app.documents["users"] if user["name"].startswith("Other")]
+    assert all(eligible[user_id] == ["first_submission"] for user_id in others)
+    assert app.ids["admin"] not in eligible
+
+
+def test_held_badges_are_not_candidates(seeded_app):
+    app = seeded_app(3)
+    asyncio.run(app.database.users.update_one(
+        {"id": app.ids["student"]}, {"$set": {"badges": ["first_submission"]}}
+    ))
+
+    assert candidates(app, {"user_id": app.ids["student"]}) == {app.ids["student"]: ["quick_solver"]}
+
+
+def test_retuned_rule_is_backfilled(seeded_app):
+    app = seeded_app(3)
+    rules = [{"badge": server.BadgeType.TECHNOLOGY_PIONEER, "metric": "high_scores",
+              "category": "technology", "threshold": 1}]
+
+    awards = candidates(app, rules=rules)
+    app.client.portal.call(server.award_badges, awards)
+
+    assert awards == {app.ids["student"]: ["technology_pioneer"]}
+    student = asyncio.run(app.database.users.find_one({"id": app.ids["student"]}))
+    assert student["badges"] == ["technology_pioneer"]
+    assert candidates(app, rules=rules) == {}
+
+
+def test_award_is_idempotent(seeded_app):
+    app = seeded_app(2)
+    awards = {app.ids["student"]: ["first_submission"]}
+
+    app.client.portal.call(server.award_badges, awards)
+    app.client.portal.call(server.award_badges, awards)
+
+    notifications = asyncio.run(app.database.notifications.count_documents({"type": "badge"}))
+    assert notifications == 1
+
+
+def test_unknown_metric_is_rejected():
+    try:
+        server.compile_badge_pipeline(rules=[{"badge": server.BadgeType.QUICK_SOLVER, "metric": "nope", "threshold": 1}])
+    except ValueError as error:
+        assert "nope" in str(error)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_badge_queries_are_indexed(seeded_app):
+    app = seeded_app(2)
+
+    assert "user_id_1" in asyncio.run(app.database.solutions.index_information())
+    assert "id_1" in asyncio.run(app.database.users.index_information())
+    assert "id_1" in asyncio.run(app.database.challenges.index_information())
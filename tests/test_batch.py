@@ -0,0 +1,73 @@
+"""POST /api/batch multiplexing."""
+
+from tests.conftest import server
+
+
+def test_batch_returns_results_in_request_order(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.post("/api/batch", headers=app.headers("student"), json={"requests": [
+        {"method": "GET", "path": "/api/me"},
+        {"method": "GET", "path": "/api/notifications?fields=title"},
+        {"method": "GET", "path": "/api/challenges/does-not-exist"},
+        {"method": "PUT", "path": f"/api/notifications/{app.ids['notification']}/read"},
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["status"] for result in results] == [200, 200, 404, 200]
+    assert results[0]["body"]["id"] == app.ids["student"]
+    assert all(set(item) == {"id", "title"} for item in results[1]["body"])
+    assert results[2]["body"] == {"detail": "Challenge not found"}
+
+
+def test_batch_items_inherit_the_callers_role(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.post("/api/batch", headers=app.headers("student"), json={"requests": [
+        {"method": "GET", "path": "/api/admin/users"},
+    ]})
+
+    assert response.json()[0]["status"] == 403
+
+
+def test_batch_sends_bodies_to_sub_requests(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.post("/api/batch", headers=app.headers("admin"), json={"requests": [
+        {"method": "PUT", "path": f"/api/challenges/{app.ids['challenge']}", "body": {"title": "Via batch"}},
+    ]})
+
+    assert response.json()[0]["status"] == 200
+    assert response.json()[0]["body"]["title"] == "Via batch"
+
+
+def test_batch_rejects_nested_and_foreign_paths(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.post("/api/batch", headers=app.headers("admin"), json={"requests": [
+        {"method": "POST", "path": "/api/batch", "body": {"requests": []}},
+        {"method": "GET", "path": "/docs"},
+        {"method": "PATCH", "path": "/api/me"},
+    ]})
+
+    assert [result["status"] for result in response.json()] == [400, 400, 400]
+
+
+def test_batch_size_is_limited(seeded_app, monkeypatch):
+    app = seeded_app(3)
+    monkeypatch.setattr(server, "BATCH_MAX_SIZE", 2)
+
+    response = app.client.post("/api/batch", headers=app.headers("admin"), json={"requests": [
+        {"method": "GET", "path": "/api/me"}
+    ] * 3})
+
+    assert response.status_code == 400
+
+
+def test_batch_requires_authentication(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.post("/api/batch", json={"requests": []})
+
+    assert response.status_code == 403
@@ -0,0 +1,98 @@
+"""Per-challenge analytics with cached score distributions."""
+
+import asyncio
+
+from tests.conftest import server
+
+
+def set_scores(app, challenge_id, scores):
+    solutions = [
+        server.Solution(challenge_id=challenge_id, user_id=f"u{i}", content="x", score=score).dict()
+        for i, score in enumerate(scores)
+    ]
+    asyncio.run(app.database.solutions.insert_many(solutions))
+
+
+def analytics(app, challenge_id):
+    return app.client.get(f"/api/admin/challenges/{challenge_id}/analytics", headers=app.headers("admin"))
+
+
+def test_challenge_analytics_summary(seeded_app):
+    app = seeded_app(2)
+    challenge_id = app.ids["open_challenge"]
+    set_scores(app, challenge_id, [10, 20, 20, 95, 100, None, None])
+
+    summary = analytics(app, challenge_id).json()
+
+    assert summary["submissions"] == 7
+    assert summary["evaluated"] == 5
+    assert summary["pending"] == 2
+    assert summary["evaluation_progress"] == 5 / 7
+    assert summary["mean_score"] == 49
+    assert summary["median_score"] == 20
+    # numpy.percentile([10, 20, 20, 95, 100], [25, 75, 90]) with linear interpolation
+    assert summary["percentiles"] == {"p25": 20.0, "p75": 95.0, "p90": 98.0}
+    counts = {bucket["min_score"]: bucket["count"] for bucket in summary["histogram"]}
+    assert counts[10] == 1 and counts[20] == 2 and counts[90] == 2
+    assert summary["histogram"][-1] == {"min_score": 90, "max_score": 100, "count": 2}
+
+
+def test_challenge_without_submissions(seeded_app):
+    app = seeded_app(2)
+
+    summary = analytics(app, app.ids["open_challenge"]).json()
+
+    assert summary["submissions"] == 0
+    assert summary["evaluation_progress"] == 0
+    assert summary["median_score"] is None
+
+
+def test_analytics_are_cached_until_a_submission(seeded_app):
+    app = seeded_app(2)
+    challenge_id = app.ids["open_challenge"]
+    analytics(app, challenge_id)
+    app.log.reset()
+
+    assert analytics(app, challenge_id).json()["submissions"] == 0
+    assert app.log.calls == []
+
+    app.client.post("/api/solutions", headers=app.headers("student"),
+                    json={"challenge_id": challenge_id, "content": "Solução"})
+    app.log.reset()
+
+    assert analytics(app, challenge_id).json()["submissions"] == 1
+    assert app.log.calls == [("solutions", "aggregate")]
+
+
+def test_evaluation_invalidates_analytics(seeded_app):
+    app = seeded_app(3)
+    challenge_id = app.documents["solutions"][0]["challenge_id"]
+    before = analytics(app, challenge_id).json()
+
+    app.client.put("/api/solutions/evaluate", headers=app.headers("admin"), json={
+        "solution_id": app.ids["pending_solution"], "score": 70, "feedback": "Bom"
+    })
+
+    after = analytics(app, challenge_id).json()
+    assert after["evaluated"] == before["evaluated"] + 1
+
+
+def test_catalog_analytics_in_one_aggregation(seeded_app):
+    app = seeded_app(4)
+    server.challenge_analytics.clear()
+    app.log.reset()
+
+    response = app.client.get("/api/admin/challenges/analytics", headers=app.headers("admin"))
+
+    assert app.log.calls == [("solutions", "aggregate")]
+    by_id = {summary["challenge_id"]: summary for summary in response.json()}
+    assert len(by_id) == len([c for c in app.documents["challenges"] if not c.get("deleted_at")])
+    assert sum(summary["submissions"] for summary in by_id.values()) == len(app.documents["solutions"])
+
+
+def test_analytics_require_admin(seeded_app):
+    app = seeded_app(2)
+
+    response = app.client.get("/api/admin/challenges/analytics", headers=app.headers("student"))
+
+    assert response.status_code == 403
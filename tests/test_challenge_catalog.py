@@ -0,0 +1,59 @@
+"""In-memory challenge catalog snapshot."""
+
+from datetime import datetime, timedelta
+
+from tests.conftest import server
+
+
+def challenge(title, category="technology", difficulty="beginner", status="active", days=7, tags=()):
+    return server.Challenge(
+        title=title,
+        description="Descrição",
+        category=category,
+        difficulty=difficulty,
+        deadline=datetime.utcnow() + timedelta(days=days),
+        criteria="Impacto",
+        points_reward=10,
+        created_by="admin",
+        status=status,
+        tags=list(tags),
+    ).dict()
+
+
+def test_snapshot_filters_by_indexes_and_search():
+    docs = [
+        challenge("Energia solar", category="sustainability"),
+        challenge("Robôs", difficulty="advanced", tags=["IA"]),
+        challenge("Antigo", status="closed"),
+    ]
+    for doc in docs:
+        for field in ("category", "difficulty", "status"):
+            doc[field] = doc[field].value
+    snapshot = server.CatalogSnapshot(docs, version=1)
+
+    assert [c["title"] for c in snapshot.filter(status="active")] == ["Energia solar", "Robôs"]
+    assert [c["title"] for c in snapshot.filter(status="active", category="sustainability")] == ["Energia solar"]
+    assert [c["title"] for c in snapshot.filter(status="active", search="^ia$")] == ["Robôs"]
+    assert snapshot.filter(status="closed", difficulty="advanced") == []
+
+
+def test_open_ids_uses_deadline_index():
+    docs = [challenge("Futuro"), challenge("Passado", days=-1)]
+    snapshot = server.CatalogSnapshot(docs, version=1)
+
+    assert snapshot.open_ids(datetime.utcnow()) == {docs[0]["id"]}
+
+
+def test_listing_is_served_from_memory_and_follows_writes(seeded_app):
+    app = seeded_app(3)
+    version = server.challenge_catalog.version
+    app.client.put(
+        f"/api/challenges/{app.ids['challenge']}", json={"status": "closed"}, headers=app.headers("admin")
+    )
+    assert server.challenge_catalog.version == version + 1
+
+    app.log.reset()
+    response = app.client.get("/api/challenges", headers=app.headers("student"))
+
+    assert app.log.calls == [("solutions", "find")]
+    assert app.ids["challenge"] not in {c["id"] for c in response.json()}
@@ -0,0 +1,108 @@
+"""Tombstoned challenge deletion with a background cascade."""
+
+import asyncio
+
+from tests.conftest import server
+
+
+def count(app, collection, query):
+    return asyncio.run(app.database[collection].count_documents(query))
+
+
+def delete(app, challenge_id):
+    return app.client.delete(f"/api/challenges/{challenge_id}", headers=app.headers("admin"))
+
+
+def test_delete_tombstones_and_cascades_in_background(seeded_app, monkeypatch):
+    app = seeded_app(3)
+    challenge_id = app.ids["challenge"]
+    asyncio.run(app.database.notifications.insert_many([
+        server.Notification(user_id=app.ids["student"], title="Aviso", message="m", type="challenge",
+                            challenge_id=challenge_id).dict()
+        for _ in range(5)
+    ]))
+    solutions = count(app, "solutions", {"challenge_id": challenge_id})
+    app.log.reset()
+
+    assert delete(app, challenge_id).status_code == 200
+
+    assert app.log.calls == [("challenges", "find_one_and_update"), ("collection_versions", "find_one_and_update")]
+    assert count(app, "solutions", {"challenge_id": challenge_id}) == solutions
+    assert app.client.get(f"/api/challenges/{challenge_id}", headers=app.headers("student")).status_code == 404
+    progress = app.client.get(f"/api/admin/challenges/{challenge_id}/deletion", headers=app.headers("admin")).json()
+    assert progress["done"] is False
+
+    monkeypatch.setattr(server, "CASCADE_BATCH_SIZE", 2)
+    app.run_jobs()
+
+    assert count(app, "solutions", {"challenge_id": challenge_id}) == 0
+    assert count(app, "archived_solutions", {"challenge_id": challenge_id}) == solutions
+    assert count(app, "notifications", {"challenge_id": challenge_id}) == 0
+    progress = app.client.get(f"/api/admin/challenges/{challenge_id}/deletion", headers=app.headers("admin")).json()
+    assert progress["done"] is True
+    assert progress["solutions_archived"] == solutions
+    assert progress["notifications_deleted"] == 5
+
+
+def test_deleted_challenge_rejects_writes(seeded_app):
+    app = seeded_app(2)
+    challenge_id = app.ids["open_challenge"]
+    delete(app, challenge_id)
+
+    assert delete(app, challenge_id).status_code == 404
+    response = app.client.put(f"/api/challenges/{challenge_id}", headers=app.headers("admin"), json={"title": "x"})
+    assert response.status_code == 404
+    response = app.client.post("/api/solutions", headers=app.headers("student"),
+                               json={"challenge_id": challenge_id, "content": "Solução"})
+    assert response.status_code == 404
+
+
+def test_tombstones_stay_out_of_the_catalog(seeded_app):
+    app = seeded_app(2)
+    app.client.portal.call(server.challenge_catalog.load)
+
+    assert server.challenge_catalog.snapshot.get(app.ids["deleted_challenge"]) is None
+    stats = app.client.get("/api/admin/stats", headers=app.headers("admin")).json()
+    assert stats["total_challenges"] == len(app.documents["challenges"]) - 1
+
+
+def test_announcements_are_tagged_with_their_challenge(seeded_app):
+    app = seeded_app(2)
+    response = app.client.post("/api/challenges", headers=app.headers("admin"), json={
+        "title": "Temporário", "description": "d", "category": "health", "difficulty": "beginner",
+        "deadline": "2999-01-01T00:00:00", "criteria": "c", "points_reward": 1,
+    })
+    challenge_id = response.json()["id"]
+    app.run_jobs()
+    assert count(app, "notifications", {"challenge_id": challenge_id}) > 0
+
+    delete(app, challenge_id)
+    app.run_jobs()
+
+    assert count(app, "notifications", {"challenge_id": challenge_id}) == 0
+
+
+def test_overlapping_cascade_runs_release_each_solution_once(seeded_app, monkeypatch):
+    app = seeded_app(3)
+    challenge_id = app.ids["challenge"]
+    solutions = count(app, "solutions", {"challenge_id": challenge_id})
+    delete(app, challenge_id)
+    archive = server.insert_ignoring_duplicates
+
+    async def yielding_archive(collection, documents):
+        # Let the other run read the same batch before either deletes it
+        await asyncio.sleep(0)
+        await archive(collection, documents)
+
+    monkeypatch.setattr(server, "insert_ignoring_duplicates", yielding_archive)
+
+    async def overlapping_runs():
+        key = f"cascade:{challenge_id}"
+        await asyncio.gather(*(server.cascade_delete_challenge_job(key, challenge_id) for _ in range(2)))
+
+    app.client.portal.call(overlapping_runs)
+
+    attachment = app.client.portal.call(server.db.attachments.find_one, {"_id": app.ids["attachment"]})
+    assert attachment["refcount"] == 3 - 1
+    progress = app.client.get(f"/api/admin/challenges/{challenge_id}/deletion", headers=app.headers("admin")).json()
+    assert progress["solutions_archived"] == solutions
@@ -0,0 +1,48 @@
+"""Aggregated student dashboard."""
+
+from tests.conftest import server
+
+
+def test_dashboard_matches_individual_endpoints(seeded_app):
+    app = seeded_app(4)
+    headers = app.headers("student")
+
+    dashboard = app.client.get("/api/dashboard", headers=headers).json()
+
+    assert dashboard["profile"] == app.client.get("/api/me", headers=headers).json()
+    assert dashboard["challenges"] == app.client.get("/api/challenges", headers=headers).json()
+    assert dashboard["my_solutions"] == app.client.get("/api/solutions/my", headers=headers).json()
+    assert dashboard["notifications"] == app.client.get("/api/notifications", headers=headers).json()
+    assert dashboard["leaderboard"] == app.client.get("/api/leaderboard").json()
+    assert dashboard["unread_notifications"] == 4
+    assert dashboard["rank"] == 1
+
+
+def test_dashboard_rank_outside_leaderboard_page(seeded_app):
+    app = seeded_app(3)
+    server.hot_reads.clear()
+    user_id = app.ids["other_user"]
+
+    response = app.client.get("/api/dashboard", headers=app.headers("other_user"))
+
+    assert response.status_code == 200
+    ranks = {entry["user_id"]: entry["rank"] for entry in response.json()["leaderboard"]}
+    assert response.json()["rank"] == ranks[user_id]
+
+
+def test_dashboard_issues_each_query_once(seeded_app):
+    app = seeded_app(3)
+    server.hot_reads.clear()
+    server.user_cache.clear()
+    app.log.reset()
+
+    response = app.client.get("/api/dashboard", headers=app.headers("student"))
+
+    assert response.status_code == 200
+    assert sorted(app.log.calls) == sorted([
+        ("users", "find_one"),
+        ("solutions", "find"),
+        ("notifications", "find"),
+        ("notifications", "count_documents"),
+        ("users", "find"),
+    ])
@@ -0,0 +1,131 @@
+"""Challenge deadline scheduler."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from tests.conftest import server
+
+
+def insert_challenge(app, deadline, **fields):
+    challenge = server.Challenge(
+        title="Desafio com prazo",
+        description="Descrição",
+        category=server.ChallengeCategory.HEALTH,
+        difficulty=server.DifficultyLevel.BEGINNER,
+        deadline=deadline,
+        criteria="Impacto",
+        points_reward=50,
+        created_by=app.ids["admin"],
+    ).dict()
+    challenge.update(fields)
+    asyncio.run(app.database.challenges.insert_one(challenge))
+    return challenge
+
+
+def find(app, collection, query):
+    return asyncio.run(app.database[collection].find(query).to_list(None))
+
+
+def run_scheduler(app):
+    app.client.portal.call(server.challenge_catalog.load)
+    server.deadline_scheduler.load()
+    return app.client.portal.call(server.deadline_scheduler.run_due)
+
+
+def test_expired_challenge_is_closed_on_recovery(seeded_app):
+    app = seeded_app(2)
+    challenge = insert_challenge(app, datetime.utcnow() - timedelta(minutes=1), reminder_sent=True)
+
+    run_scheduler(app)
+
+    [stored] = find(app, "challenges", {"id": challenge["id"]})
+    assert stored["status"] == server.ChallengeStatus.CLOSED
+
+
+def test_challenge_with_pending_solutions_moves_to_evaluation(seeded_app):
+    app = seeded_app(2)
+    challenge = insert_challenge(app, datetime.utcnow() - timedelta(minutes=1), reminder_sent=True)
+    solution = server.Solution(challenge_id=challenge["id"], user_id=app.ids["student"], content="x")
+    asyncio.run(app.database.solutions.insert_one(solution.dict()))
+
+    run_scheduler(app)
+
+    [stored] = find(app, "challenges", {"id": challenge["id"]})
+    assert stored["status"] == server.ChallengeStatus.EVALUATION
+
+
+def test_reminder_reaches_only_users_without_submissions(seeded_app):
+    app = seeded_app(2)
+    challenge = insert_challenge(app, datetime.utcnow() + timedelta(hours=3))
+    solution = server.Solution(challenge_id=challenge["id"], user_id=app.ids["student"], content="x")
+    asyncio.run(app.database.solutions.insert_one(solution.dict()))
+
+    run_scheduler(app)
+    run_scheduler(app)
+
+    reminders = find(app, "notifications", {"title": "Prazo Encerrando! ⏰"})
+    recipients = sorted(n["user_id"] for n in reminders)
+    others = sorted(u["id"] for u in app.documents["users"] if u["name"].startswith("Other"))
+    assert recipients == others
+    [stored] = find(app, "challenges", {"id": challenge["id"]})
+    assert stored["status"] == server.ChallengeStatus.ACTIVE
+
+
+def test_stale_deadline_event_is_skipped(seeded_app):
+    app = seeded_app(2)
+    # The deadline was extended after this event had been scheduled
+    challenge = insert_challenge(app, datetime.utcnow() + timedelta(days=2), reminder_sent=True)
+    stale = dict(challenge, deadline=datetime.utcnow() - timedelta(minutes=1))
+
+    server.deadline_scheduler.schedule(stale)
+    app.client.portal.call(server.deadline_scheduler.run_due)
+
+    [stored] = find(app, "challenges", {"id": challenge["id"]})
+    assert stored["status"] == server.ChallengeStatus.ACTIVE
+
+
+def test_failed_event_is_retried_with_backoff(seeded_app, monkeypatch):
+    app = seeded_app(2)
+    challenge = insert_challenge(app, datetime.utcnow() - timedelta(minutes=1), reminder_sent=True)
+    close_challenge = server.deadline_scheduler._close_challenge
+
+    async def flaky(challenge_id):
+        monkeypatch.setattr(server.deadline_scheduler, "_close_challenge", close_challenge)
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(server.deadline_scheduler, "_close_challenge", flaky)
+    run_scheduler(app)
+
+    assert find(app, "challenges", {"id": challenge["id"]})[0]["status"] == server.ChallengeStatus.ACTIVE
+    retry = next(event for event in server.deadline_scheduler._heap if event[2] == challenge["id"])
+    assert retry[0] > datetime.utcnow() and retry[3] == 1
+
+    server.deadline_scheduler._heap = [(datetime.utcnow(), *retry[1:])]
+    app.client.portal.call(server.deadline_scheduler.run_due)
+    assert find(app, "challenges", {"id": challenge["id"]})[0]["status"] == server.ChallengeStatus.CLOSED
+
+
+def test_failed_reminder_run_is_resent_without_duplicates(seeded_app, monkeypatch):
+    app = seeded_app(3)
+    challenge = insert_challenge(app, datetime.utcnow() + timedelta(hours=3))
+    insert = server.insert_ignoring_duplicates
+    batches = []
+
+    async def flaky(collection, documents):
+        batches.append(documents)
+        await insert(collection, documents)
+        if len(batches) == 2:
+            raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(server, "NOTIFICATION_BATCH_SIZE", 1)
+    monkeypatch.setattr(server, "insert_ignoring_duplicates", flaky)
+    run_scheduler(app)
+    assert find(app, "challenges", {"id": challenge["id"]})[0].get("reminder_sent") is not True
+
+    retry = next(event for event in server.deadline_scheduler._heap if event[2] == challenge["id"])
+    server.deadline_scheduler._heap = [(datetime.utcnow(), *retry[1:])]
+    app.client.portal.call(server.deadline_scheduler.run_due)
+
+    reminders = find(app, "notifications", {"challenge_id": challenge["id"]})
+    assert len(reminders) == len({n["user_id"] for n in reminders}) == len(app.documents["users"]) - 1
+    assert find(app, "challenges", {"id": challenge["id"]})[0]["reminder_sent"] is True
@@ -0,0 +1,98 @@
+"""Pending-evaluation work queue with leases."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from tests.conftest import server
+
+
+def make_grader(app):
+    grader = server.User(
+        email="grader@pucrs.edu.br", name="Grader", password_hash="x", role=server.UserRole.ADMIN
+    ).dict()
+    asyncio.run(app.database.users.insert_one(dict(grader)))
+    return {"Authorization": f"Bearer {server.create_user_token(grader)}"}
+
+
+def pending_ids(app):
+    solutions = asyncio.run(app.database.solutions.find({"score": None}).to_list(None))
+    return [solution["id"] for solution in sorted(solutions, key=lambda solution: solution["submitted_at"])]
+
+
+def claim(app, headers, count=5, **params):
+    query = "&".join([f"count={count}"] + [f"{key}={value}" for key, value in params.items()])
+    return app.client.post(f"/api/solutions/claim?{query}", headers=headers)
+
+
+def test_graders_never_receive_the_same_solution(seeded_app):
+    app = seeded_app(6)
+    other = make_grader(app)
+
+    first = claim(app, app.headers("admin"), count=3).json()
+    second = claim(app, other, count=20).json()
+
+    first_ids = {solution["id"] for solution in first}
+    second_ids = {solution["id"] for solution in second}
+    assert len(first_ids) == 3
+    assert first_ids.isdisjoint(second_ids)
+    assert app.ids["claimed_solution"] not in second_ids
+    # Between them they drained the queue, oldest first
+    assert [solution["id"] for solution in first] == [
+        solution_id for solution_id in pending_ids(app) if solution_id != app.ids["claimed_solution"]
+    ][:3]
+    assert claim(app, other).json() == []
+
+
+def test_expired_lease_is_claimable(seeded_app):
+    app = seeded_app(2)
+    asyncio.run(app.database.solutions.update_many(
+        {"score": None}, {"$set": {"claimed_by": "someone", "claim_expires_at": datetime.utcnow() - timedelta(minutes=1)}}
+    ))
+
+    claimed = claim(app, app.headers("admin"), count=20).json()
+
+    assert sorted(solution["id"] for solution in claimed) == sorted(pending_ids(app))
+
+
+def test_claim_by_challenge(seeded_app):
+    app = seeded_app(4)
+    challenge_id = app.ids["challenge"]
+
+    claimed = claim(app, app.headers("admin"), count=20, challenge_id=challenge_id).json()
+
+    assert claimed and all(solution["challenge_id"] == challenge_id for solution in claimed)
+
+
+def test_evaluating_someone_elses_claim_conflicts(seeded_app):
+    app = seeded_app(3)
+    other = make_grader(app)
+    claimed = claim(app, other, count=1).json()[0]
+
+    response = app.client.put("/api/solutions/evaluate", headers=app.headers("admin"), json={
+        "solution_id": claimed["id"], "score": 50, "feedback": "Ok"
+    })
+    assert response.status_code == 409
+
+    response = app.client.put("/api/solutions/evaluate", headers=other, json={
+        "solution_id": claimed["id"], "score": 50, "feedback": "Ok"
+    })
+    assert response.status_code == 200
+    solution = asyncio.run(app.database.solutions.find_one({"id": claimed["id"]}))
+    assert solution["claimed_by"] is None
+
+
+def test_release_returns_solution_to_queue(seeded_app):
+    app = seeded_app(2)
+    other = make_grader(app)
+    released = app.ids["claimed_solution"]
+
+    assert app.client.post(f"/api/solutions/{released}/release", headers=other).status_code == 404
+    assert app.client.post(f"/api/solutions/{released}/release", headers=app.headers("admin")).status_code == 200
+
+    assert released in {solution["id"] for solution in claim(app, other, count=20).json()}
+
+
+def test_claim_count_is_bounded(seeded_app):
+    app = seeded_app(2)
+
+    assert claim(app, app.headers("admin"), count=1000).status_code == 422
@@ -0,0 +1,49 @@
+"""The fast list serialization path must match the Pydantic output."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from tests.conftest import server
+
+NOW = datetime(2025, 3, 14, 15, 9, 26, 535000)
+
+CASES = [
+    (server.ChallengeResponse, {
+        "id": "c1", "title": "Desafio", "description": "Descrição", "category": "health",
+        "difficulty": "advanced", "deadline": NOW, "criteria": "Impacto", "points_reward": 50,
+        "status": "active", "created_by": "admin", "created_at": NOW, "tags": ["saúde"],
+    }, {"user_submitted": True, "can_submit": False}),
+    (server.SolutionResponse, {
+        "id": "s1", "challenge_id": "c1", "user_id": "u1", "content": "Solução",
+        "submitted_at": NOW, "score": None,
+    }, {"challenge_title": "Desafio", "user_name": "João"}),
+    (server.UserManagement, {
+        "id": "u1", "email": "joao@pucrs.edu.br", "name": "João", "role": "student", "points": 10,
+        "badges": [], "created_at": NOW, "is_active": True,
+    }, {}),
+    (server.NotificationResponse, {
+        "id": "n1", "user_id": "u1", "title": "Aviso", "message": "Mensagem", "type": "system",
+        "read": False, "created_at": NOW,
+    }, {}),
+]
+
+
+@pytest.mark.parametrize("model,document,extra", CASES, ids=lambda case: getattr(case, "__name__", ""))
+def test_fast_path_matches_model_serialization(model, document, extra):
+    expected = model(**document, **extra).model_dump(mode="json")
+
+    fast = server.fast_json_response([server.project_document(model, document, **extra)]).body
+
+    assert json.loads(fast) == [expected]
+
+
+def test_fast_response_keeps_conditional_headers(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.get("/api/challenges", headers=app.headers("student"))
+
+    assert response.headers["etag"]
+    assert response.headers["content-type"] == "application/json"
+    assert len(response.json()) == 5
@@ -0,0 +1,70 @@
+"""ETag / Cache-Control conditional responses on read endpoints."""
+
+from tests.conftest import server
+
+
+def test_matching_etag_returns_304_without_querying(seeded_app):
+    app = seeded_app(3)
+    headers = app.headers("student")
+    first = app.client.get("/api/challenges", headers=headers)
+    etag = first.headers["etag"]
+
+    app.log.reset()
+    second = app.client.get("/api/challenges", headers={**headers, "If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert app.log.calls == []
+
+
+def test_write_changes_the_etag(seeded_app):
+    app = seeded_app(3)
+    headers = app.headers("student")
+    etag = app.client.get("/api/challenges", headers=headers).headers["etag"]
+
+    app.client.put(
+        f"/api/challenges/{app.ids['challenge']}", json={"title": "Novo título"}, headers=app.headers("admin")
+    )
+    response = app.client.get("/api/challenges", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_is_per_user(seeded_app):
+    app = seeded_app(3)
+    student_etag = app.client.get("/api/notifications", headers=app.headers("student")).headers["etag"]
+    admin = app.client.get(
+        "/api/notifications", headers={**app.headers("admin"), "If-None-Match": student_etag}
+    )
+
+    assert admin.status_code == 200
+
+
+def test_leaderboard_is_publicly_cacheable(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.get("/api/leaderboard")
+
+    assert response.headers["cache-control"] == f"public, max-age={server.LEADERBOARD_CACHE_SECONDS}"
+    revalidated = app.client.get("/api/leaderboard", headers={"If-None-Match": f"W/{response.headers['etag']}"})
+    assert revalidated.status_code == 304
+
+
+def test_writes_by_other_processes_change_the_etag(seeded_app):
+    app = seeded_app(3)
+    headers = app.headers("student")
+    etag = app.client.get("/api/notifications", headers=headers).headers["etag"]
+
+    # A job worker in another process delivers a notification and bumps the shared counter
+    app.client.portal.call(app.database.notifications.insert_one, server.Notification(
+        user_id=app.ids["student"], title="Nova", message="Mensagem", type="system"
+    ).dict())
+    app.client.portal.call(
+        app.database.collection_versions.update_one, {"_id": "notifications"}, {"$inc": {"version": 1}}, True
+    )
+    app.client.portal.call(server.collection_versions.load)
+
+    response = app.client.get("/api/notifications", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 4
@@ -0,0 +1,168 @@
+"""Outbox-backed background job queue."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from tests.conftest import server
+
+
+def find(app, collection, query):
+    return asyncio.run(app.database[collection].find(query).to_list(None))
+
+
+def test_submission_returns_before_badges_are_awarded(seeded_app):
+    app = seeded_app(2)
+    outsider = app.ids["other_user"]
+    asyncio.run(app.database.solutions.delete_many({"user_id": outsider}))
+
+    response = app.client.post(
+        "/api/solutions",
+        headers=app.headers("other_user"),
+        json={"challenge_id": app.ids["open_challenge"], "content": "Solução"},
+    )
+    assert response.status_code == 200
+    assert find(app, "users", {"id": outsider})[0]["badges"] == []
+    assert find(app, "solutions", {"id": response.json()["id"]})[0]["outbox"][0]["type"] == "award_badges"
+
+    assert app.run_jobs() == 1
+
+    assert find(app, "users", {"id": outsider})[0]["badges"] == [server.BadgeType.FIRST_SUBMISSION]
+    assert len(find(app, "notifications", {"user_id": outsider, "type": "badge"})) == 1
+    assert find(app, "solutions", {"id": response.json()["id"]})[0]["outbox"] == []
+
+
+def test_challenge_announcement_is_idempotent(seeded_app):
+    app = seeded_app(3)
+    response = app.client.post("/api/challenges", headers=app.headers("admin"), json={
+        "title": "Anunciado",
+        "description": "Descrição",
+        "category": "health",
+        "difficulty": "beginner",
+        "deadline": (datetime.utcnow() + timedelta(days=3)).isoformat(),
+        "criteria": "Impacto",
+        "points_reward": 10,
+    })
+    assert response.status_code == 200
+    app.run_jobs()
+
+    # A relay that crashed before pulling the outbox entry re-delivers the same key
+    announce = find(app, "jobs", {})[0]
+    asyncio.run(app.database.jobs.update_one({"_id": announce["_id"]}, {"$set": {"status": "pending"}}))
+    app.run_jobs()
+
+    announced = find(app, "notifications", {"type": "challenge"})
+    assert len(announced) == len(app.documents["users"]) - 1
+    assert app.ids["admin"] not in {notification["user_id"] for notification in announced}
+
+
+def test_evaluation_notification_is_queued(seeded_app):
+    app = seeded_app(2)
+    student = app.ids["student"]
+
+    response = app.client.put("/api/solutions/evaluate", headers=app.headers("admin"), json={
+        "solution_id": app.ids["pending_solution"], "score": 70, "feedback": "Bom"
+    })
+    assert response.status_code == 200
+    assert find(app, "notifications", {"user_id": student, "type": "evaluation"}) == []
+
+    assert app.run_jobs() == 2
+    assert len(find(app, "notifications", {"user_id": student, "type": "evaluation"})) == 1
+
+
+def test_failing_job_is_retried_then_dead_lettered(seeded_app, monkeypatch):
+    app = seeded_app(2)
+    calls = []
+
+    async def flaky(key, user_id):
+        calls.append(key)
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(server.job_queue.handlers, "award_badges", flaky)
+    monkeypatch.setattr(server, "JOB_RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(server, "JOB_MAX_ATTEMPTS", 3)
+    app.client.post(
+        "/api/solutions",
+        headers=app.headers("student"),
+        json={"challenge_id": app.ids["open_challenge"], "content": "Solução"},
+    )
+
+    app.run_jobs()
+
+    assert len(calls) == 3
+    assert find(app, "jobs", {}) == []
+    dead = find(app, "dead_jobs", {})
+    assert len(dead) == 1
+    assert dead[0]["attempts"] == 3
+    assert "boom" in dead[0]["last_error"]
+
+
+def test_expired_lease_is_reclaimed(seeded_app):
+    app = seeded_app(2)
+    past = datetime.utcnow() - timedelta(minutes=1)
+    asyncio.run(app.database.jobs.insert_one({
+        "_id": "notify:orphan",
+        "type": "notify",
+        "payload": {"user_id": app.ids["student"], "title": "Órfão", "message": "Mensagem",
+                    "notification_type": "system"},
+        "status": "running",
+        "attempts": 1,
+        "run_at": past,
+        "lease_until": past,
+    }))
+
+    assert app.run_jobs() == 1
+    assert find(app, "jobs", {"_id": "notify:orphan"})[0]["status"] == "done"
+    assert len(find(app, "notifications", {"title": "Órfão"})) == 1
+
+
+def test_relay_and_claims_are_indexed(seeded_app):
+    app = seeded_app(2)
+
+    outbox = asyncio.run(app.database.solutions.index_information())["outbox.key_1"]
+    jobs = asyncio.run(app.database.jobs.index_information())
+
+    assert outbox["partialFilterExpression"] == server.JobQueue.HAS_OUTBOX
+    assert {"status_1_run_at_1", "status_1_lease_until_1"} <= set(jobs)
+    assert jobs["finished_at_1"]["expireAfterSeconds"] == server.JOB_RETENTION_SECONDS
+
+
+def test_lease_is_renewed_while_the_handler_runs(seeded_app, monkeypatch):
+    app = seeded_app(2)
+    leases = []
+
+    async def slow(key, user_id):
+        leases.append((await server.db.jobs.find_one({"_id": key}))["lease_until"])
+        await asyncio.sleep(0.05)
+        leases.append((await server.db.jobs.find_one({"_id": key}))["lease_until"])
+
+    monkeypatch.setitem(server.job_queue.handlers, "award_badges", slow)
+    monkeypatch.setattr(server, "JOB_LEASE_RENEW_SECONDS", 0.01)
+    app.client.post(
+        "/api/solutions",
+        headers=app.headers("student"),
+        json={"challenge_id": app.ids["open_challenge"], "content": "Solução"},
+    )
+
+    assert app.run_jobs() == 1
+    assert leases[1] > leases[0]
+
+
+def test_job_that_keeps_killing_its_worker_is_dead_lettered(seeded_app):
+    app = seeded_app(2)
+    past = datetime.utcnow() - timedelta(minutes=1)
+    asyncio.run(app.database.jobs.insert_one({
+        "_id": "notify:poison",
+        "type": "notify",
+        "payload": {"user_id": app.ids["student"], "title": "Veneno", "message": "Mensagem",
+                    "notification_type": "system"},
+        "status": "running",
+        "attempts": server.JOB_MAX_ATTEMPTS,
+        "run_at": past,
+        "lease_until": past,
+    }))
+
+    assert app.run_jobs() == 0
+    assert find(app, "jobs", {"_id": "notify:poison"}) == []
+    dead = find(app, "dead_jobs", {"_id": "notify:poison"})
+    assert dead[0]["attempts"] == server.JOB_MAX_ATTEMPTS
+    assert find(app, "notifications", {"title": "Veneno"}) == []
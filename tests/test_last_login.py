@@ -0,0 +1,42 @@
+"""Write-behind batching of last_login updates."""
+
+import asyncio
+
+from tests.conftest import TEST_PASSWORD, server
+
+
+def stored_last_login(app, key):
+    async def read():
+        user = await app.database.users.find_one({"id": app.ids[key]})
+        return user["last_login"]
+
+    return asyncio.run(read())
+
+
+def test_login_defers_last_login_write(seeded_app):
+    app = seeded_app(3)
+    before = stored_last_login(app, "student")
+
+    response = app.client.post(
+        "/api/login", json={"email": app.ids["student_email"], "password": TEST_PASSWORD}
+    )
+
+    assert response.status_code == 200
+    assert ("users", "update_one") not in app.log.calls
+    assert stored_last_login(app, "student") == before
+    assert server.last_login_buffer.latest(app.ids["student"]) is not None
+
+
+def test_buffer_flushes_as_one_bulk_write(seeded_app):
+    app = seeded_app(3)
+    for key in ("admin", "student"):
+        app.client.post(
+            "/api/login", json={"email": app.user(key)["email"], "password": TEST_PASSWORD}
+        )
+    app.log.reset()
+
+    app.client.portal.call(server.last_login_buffer.flush)
+
+    assert app.log.calls == [("users", "bulk_write")]
+    assert server.last_login_buffer.pending == {}
+    assert stored_last_login(app, "student") > app.user("student")["last_login"]
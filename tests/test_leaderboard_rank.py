@@ -0,0 +1,69 @@
+"""Rank and neighborhood queries on the leaderboard."""
+
+import asyncio
+
+from tests.conftest import server
+
+
+def ordered_active_users(app):
+    users = asyncio.run(app.database.users.find({"is_active": True}).to_list(None))
+    return [user["id"] for user in sorted(users, key=lambda user: (-user["points"], user["id"]))]
+
+
+def test_neighborhood_matches_full_sort(seeded_app):
+    app = seeded_app(12)
+    # Create ties so the id tie-break matters
+    asyncio.run(app.database.users.update_many({"points": {"$lt": 6}}, {"$set": {"points": 3}}))
+    server.user_cache.clear()
+    order = ordered_active_users(app)
+
+    for user_id in order:
+        position = app.client.get(f"/api/leaderboard/around/{user_id}?k=2").json()
+        rank = order.index(user_id) + 1
+        assert position["rank"] == rank
+        window = order[max(0, rank - 3):rank + 2]
+        assert [entry["user_id"] for entry in position["entries"]] == window
+        assert [entry["rank"] for entry in position["entries"]] == [order.index(uid) + 1 for uid in window]
+
+
+def test_my_position_uses_constant_queries(seeded_app):
+    app = seeded_app(10)
+    app.client.get("/api/me", headers=app.headers("other_user"))
+    app.log.reset()
+
+    position = app.client.get("/api/leaderboard/me?k=0", headers=app.headers("other_user")).json()
+
+    assert app.log.calls == [("users", "count_documents")]
+    assert position["rank"] == ordered_active_users(app).index(app.ids["other_user"]) + 1
+    assert [entry["user_id"] for entry in position["entries"]] == [app.ids["other_user"]]
+
+
+def test_top_page_agrees_with_rank(seeded_app):
+    app = seeded_app(5)
+    asyncio.run(app.database.users.update_many({}, {"$set": {"points": 7}}))
+    server.user_cache.clear()
+    server.hot_reads.clear()
+
+    top = app.client.get("/api/leaderboard").json()
+
+    assert [entry["user_id"] for entry in top] == ordered_active_users(app)
+    # The shared result holds only what the leaderboard shows
+    cached = app.client.portal.call(server.leaderboard_users)
+    assert {field for user in cached for field in user} == set(server.LEADERBOARD_PROJECTION) - {"_id"}
+
+
+def test_inactive_user_has_no_position(seeded_app):
+    app = seeded_app(3)
+    app.client.put(f"/api/admin/users/{app.ids['other_user']}/toggle-active", headers=app.headers("admin"))
+
+    response = app.client.get(f"/api/leaderboard/around/{app.ids['other_user']}")
+
+    assert response.status_code == 404
+
+
+def test_neighbor_count_is_bounded(seeded_app):
+    app = seeded_app(2)
+
+    response = app.client.get(f"/api/leaderboard/around/{app.ids['student']}?k=1000")
+
+    assert response.status_code == 422
@@ -0,0 +1,95 @@
+"""Points ledger, windowed leaderboards and reconciliation."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from tests.conftest import server
+
+
+def find(app, collection, query):
+    return asyncio.run(app.database[collection].find(query).to_list(None))
+
+
+def evaluate(app, score=40):
+    return app.client.put("/api/solutions/evaluate", headers=app.headers("admin"), json={
+        "solution_id": app.ids["pending_solution"], "score": score, "feedback": "Bom"
+    })
+
+
+def test_evaluation_appends_to_ledger_and_rollups(seeded_app):
+    app = seeded_app(3)
+    student = app.ids["student"]
+
+    assert evaluate(app).status_code == 200
+
+    entries = find(app, "points_ledger", {"user_id": student, "solution_id": app.ids["pending_solution"]})
+    assert [(entry["points"], entry["category"]) for entry in entries] == [(40, "technology")]
+    week = server.window_buckets(datetime.utcnow())["week"]
+    rollup = find(app, "points_rollups", {"_id": server.rollup_key("week", week, "technology", student)})[0]
+    assert rollup["points"] == 30 + 40
+    assert find(app, "users", {"id": student})[0]["points"] == 30 + 40
+
+
+def test_windowed_leaderboard_is_served_from_rollups(seeded_app):
+    app = seeded_app(3)
+    student = app.ids["student"]
+    old = server.PointsEntry(user_id=app.ids["other_user"], points=1000, reason="evaluation",
+                             category="health", created_at=datetime.utcnow() - timedelta(days=60))
+    asyncio.run(app.database.points_rollups.insert_many([
+        {"_id": server.rollup_key(*key), "window": key[0], "bucket": key[1], "category": key[2],
+         "user_id": key[3], "points": points}
+        for key, points in server.rollup_increments([old.dict()]).items()
+    ]))
+    app.log.reset()
+
+    weekly = app.client.get("/api/leaderboard?window=week").json()
+
+    assert [call[0] for call in app.log.calls] == ["points_rollups", "users"]
+    assert weekly[0] == {**weekly[0], "user_id": student, "points": 30, "rank": 1}
+    health = app.client.get("/api/leaderboard?category=health").json()
+    assert [(entry["user_id"], entry["points"]) for entry in health] == [(app.ids["other_user"], 1000)]
+    assert app.client.get("/api/leaderboard?window=month&category=health").json() == []
+
+
+def test_windowed_leaderboard_hides_inactive_users(seeded_app):
+    app = seeded_app(3)
+    app.client.put(f"/api/admin/users/{app.ids['student']}/toggle-active", headers=app.headers("admin"))
+
+    weekly = app.client.get("/api/leaderboard?window=day").json()
+
+    assert app.ids["student"] not in {entry["user_id"] for entry in weekly}
+
+
+def test_leaderboard_rejects_unknown_window(seeded_app):
+    app = seeded_app(2)
+
+    assert app.client.get("/api/leaderboard?window=year").status_code == 422
+
+
+def test_reconcile_rebuilds_points_and_rollups(seeded_app):
+    app = seeded_app(3)
+    evaluate(app)
+    student = app.ids["student"]
+    asyncio.run(app.database.users.update_one({"id": student}, {"$set": {"points": 9999}}))
+    asyncio.run(app.database.points_rollups.update_many({}, {"$inc": {"points": 5}}))
+    asyncio.run(app.database.points_rollups.insert_one({"_id": "stale", "window": "day", "points": 1}))
+    expected = sorted((rollup["_id"], rollup["points"] - 5) for rollup in find(app, "points_rollups", {"_id": {"$ne": "stale"}}))
+
+    result = app.client.portal.call(server.reconcile_points)
+
+    assert result["users_corrected"] == 1
+    assert find(app, "users", {"id": student})[0]["points"] == 70
+    assert sorted((rollup["_id"], rollup["points"]) for rollup in find(app, "points_rollups", {})) == expected
+    assert result["concurrent_entries"] == 0
+
+
+def test_reconcile_reports_entries_recorded_during_the_run(seeded_app):
+    app = seeded_app(3)
+    late = server.PointsEntry(
+        user_id=app.ids["student"], points=5, reason="evaluation", created_at=datetime.utcnow() + timedelta(minutes=1)
+    )
+    asyncio.run(app.database.points_ledger.insert_one(late.dict()))
+
+    result = app.client.portal.call(server.reconcile_points)
+
+    assert result["concurrent_entries"] == 1
@@ -0,0 +1,114 @@
+"""Challenge search over the catalog snapshot and admin user search."""
+
+from tests.conftest import server
+
+
+def search(app, q, user="student"):
+    return app.client.get("/api/search", params={"q": q}, headers=app.headers(user))
+
+
+def test_normalized_queries_share_a_cache_entry(seeded_app):
+    app = seeded_app(3)
+
+    first = search(app, "desafio")
+    app.log.reset()
+    second = search(app, "  DESAFIO ")
+
+    assert second.json()["challenges"] == first.json()["challenges"]
+    assert app.log.calls == [("solutions", "find")]
+    stats = app.client.get("/api/admin/cache-stats", headers=app.headers("admin")).json()["search_results"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_results_are_ranked_and_exclude_deleted_challenges(seeded_app):
+    app = seeded_app(3)
+
+    titles = [challenge["title"] for challenge in search(app, "desafio").json()["challenges"]]
+    by_tag = search(app, "inovacao").json()["challenges"]
+
+    assert "Desafio excluído" not in titles
+    assert titles[:3] == ["Desafio 0", "Desafio 1", "Desafio 2"]
+    assert len(by_tag) == len(titles)
+
+
+def test_user_flags_are_overlaid_per_user(seeded_app):
+    app = seeded_app(3)
+
+    student = {c["title"]: c["user_submitted"] for c in search(app, "desafio").json()["challenges"]}
+    other = {c["title"]: c["user_submitted"] for c in search(app, "desafio", "admin").json()["challenges"]}
+
+    assert student["Desafio 0"] and not student["Desafio aberto"]
+    assert not any(other.values())
+
+
+def test_challenge_writes_invalidate_cached_results(seeded_app):
+    app = seeded_app(3)
+    assert search(app, "sustentabilidade").json()["challenges"] == []
+
+    app.client.post("/api/challenges", headers=app.headers("admin"), json={
+        "title": "Campus e sustentabilidade",
+        "description": "Reduzir o consumo de energia",
+        "category": "sustainability",
+        "difficulty": "beginner",
+        "deadline": "2099-01-01T00:00:00",
+        "criteria": "Impacto",
+        "points_reward": 50,
+    })
+
+    titles = [challenge["title"] for challenge in search(app, "Sustentabilidade").json()["challenges"]]
+    assert titles == ["Campus e sustentabilidade"]
+
+
+def test_queries_are_literal_text():
+    snapshot = server.CatalogSnapshot([{
+        "id": "c1", "title": "IA (generativa)", "description": "", "tags": [], "status": "active",
+        "category": "technology", "difficulty": "beginner", "created_at": 0, "deadline": server.datetime(2099, 1, 1)
+    }], version=1)
+
+    assert snapshot.search(server.normalize_search_query("ia (gen"), 50) == ["c1"]
+    assert snapshot.search(server.normalize_search_query(".*"), 50) == []
+
+
+def test_cache_evicts_least_recently_used():
+    cache = server.SearchResultCache(max_size=2)
+    snapshot = server.CatalogSnapshot([], version=1)
+    for query in ("a", "b", "a", "c"):
+        cache.get(snapshot, query)
+
+    assert list(cache._entries) == ["a", "c"]
+
+
+def register(app, name, email):
+    response = app.client.post("/api/register", json={"email": email, "name": name, "password": "segredo123"})
+    assert response.status_code == 200
+
+
+def user_names(app, q):
+    return sorted(user["name"] for user in search(app, q, "admin").json()["users"])
+
+
+def test_user_search_ignores_accents_and_case(seeded_app):
+    app = seeded_app(3)
+    register(app, "João Conceição", "joao.conceicao@pucrs.br")
+    register(app, "Joana Silva", "jsilva@pucrs.br")
+
+    assert user_names(app, "Joao") == ["João Conceição"]
+    assert user_names(app, "CONCEIÇAO") == ["João Conceição"]
+    assert user_names(app, "jo") == ["Joana Silva", "João Conceição"]
+    assert user_names(app, "jo sil") == ["Joana Silva"]
+    assert user_names(app, "jsilva@pucrs") == ["Joana Silva"]
+    assert user_names(app, "j.*") == []
+
+
+def test_user_search_is_admin_only(seeded_app):
+    app = seeded_app(3)
+
+    assert search(app, "student", "admin").json()["users"]
+    assert search(app, "student").json()["users"] == []
+
+
+def test_user_search_keys():
+    assert server.user_search_keys("Júlia  Araújo", "Julia.Araujo-2@PUCRS.br") == [
+        "2", "araujo", "julia", "julia.araujo-2@pucrs.br"
+    ]
+    assert server.user_search_filter("   ") is None
@@ -0,0 +1,59 @@
+"""Single-flight coalescing of hot read queries."""
+
+import asyncio
+
+from tests.conftest import server
+
+
+def test_concurrent_identical_reads_share_one_call():
+    flight = server.SingleFlight()
+    calls = []
+
+    async def query():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", query) for _ in range(20)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result == ["result"] for result in results)
+    assert flight.stats()["shared_in_flight"] == 19
+
+
+def test_failed_call_is_not_cached():
+    flight = server.SingleFlight()
+    attempts = []
+
+    async def query():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    async def main():
+        try:
+            await flight.do("key", query, ttl=60)
+        except RuntimeError:
+            pass
+        return await flight.do("key", query, ttl=60)
+
+    assert asyncio.run(main()) == "ok"
+    assert len(attempts) == 2
+
+
+def test_leaderboard_result_is_reused_until_users_change(seeded_app):
+    app = seeded_app(3)
+    app.client.get("/api/leaderboard")
+
+    app.log.reset()
+    app.client.get("/api/leaderboard")
+    assert app.log.calls == []
+
+    app.client.put(f"/api/admin/users/{app.ids['other_user']}/toggle-active", headers=app.headers("admin"))
+    app.log.reset()
+    app.client.get("/api/leaderboard")
+    assert ("users", "find") in app.log.calls
@@ -0,0 +1,59 @@
+"""Sparse fieldsets (?fields=) on list endpoints."""
+
+from tests.conftest import server
+
+
+def test_challenges_return_only_requested_fields(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.get("/api/challenges?fields=title,can_submit", headers=app.headers("student"))
+
+    assert response.status_code == 200
+    assert all(set(item) == {"id", "title", "can_submit"} for item in response.json())
+
+
+def test_unknown_field_is_rejected(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.get("/api/solutions/my?fields=content,password_hash", headers=app.headers("student"))
+
+    assert response.status_code == 400
+    assert "password_hash" in response.json()["detail"]
+
+
+def test_users_cannot_select_password_hash(seeded_app):
+    app = seeded_app(3)
+
+    response = app.client.get("/api/admin/users?fields=password_hash", headers=app.headers("admin"))
+
+    assert response.status_code == 400
+
+
+def test_solutions_skip_user_lookup_when_name_not_selected(seeded_app):
+    app = seeded_app(3)
+    server.user_cache.clear()
+    app.log.reset()
+
+    response = app.client.get("/api/solutions?fields=score,challenge_title", headers=app.headers("admin"))
+
+    assert response.status_code == 200
+    assert app.log.calls == [("solutions", "find")]
+    assert all(set(item) == {"id", "score", "challenge_title"} for item in response.json())
+
+
+def test_notification_etag_depends_on_fields(seeded_app):
+    app = seeded_app(3)
+    headers = app.headers("student")
+
+    full = app.client.get("/api/notifications", headers=headers)
+    sparse = app.client.get(
+        "/api/notifications?fields=title", headers={**headers, "If-None-Match": full.headers["ETag"]}
+    )
+
+    assert sparse.status_code == 200
+    assert all(set(item) == {"id", "title"} for item in sparse.json())
+
+
+def test_field_projection():
+    assert server.field_projection(None) is None
+    assert server.field_projection(("id", "score"), "user_id") == {"_id": 0, "id": 1, "score": 1, "user_id": 1}
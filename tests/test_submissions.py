@@ -0,0 +1,86 @@
+"""Insert-first solution submission backed by a unique index."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from tests.conftest import server
+
+
+def submit(app, **extra):
+    return app.client.post("/api/solutions", headers=app.headers("student"), json={
+        "challenge_id": app.ids["open_challenge"], "content": "Minha solução", **extra
+    })
+
+
+def test_submission_reads_the_challenge_from_the_catalog(seeded_app):
+    app = seeded_app(3)
+
+    response = submit(app)
+
+    assert response.status_code == 200
+    assert app.log.calls == [("solutions", "insert_one"), ("collection_versions", "find_one_and_update")]
+
+
+def test_second_submission_is_rejected(seeded_app):
+    app = seeded_app(3)
+    assert submit(app).status_code == 200
+
+    response = submit(app, files=["b3V0cm8="], file_names=["outro.txt"])
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Solution already submitted for this challenge"
+    # The duplicate's attachment was released again
+    attachment = app.client.portal.call(server.db.attachments.find_one, {"size": 5})
+    assert attachment["refcount"] == 0
+
+
+def test_concurrent_submissions_store_one_solution(seeded_app):
+    app = seeded_app(3)
+    principal = server.CurrentUser(app.ids["student"], server.UserRole.STUDENT)
+    submission = server.SolutionSubmit(challenge_id=app.ids["open_challenge"], content="Corrida")
+
+    async def rush():
+        return await asyncio.gather(
+            *(server.submit_solution(submission, principal) for _ in range(10)), return_exceptions=True
+        )
+
+    results = app.client.portal.call(rush)
+
+    assert sum(isinstance(result, server.Solution) for result in results) == 1
+    assert all(result.status_code == 400 for result in results if isinstance(result, HTTPException))
+    assert app.client.portal.call(
+        server.db.solutions.count_documents, {"challenge_id": app.ids["open_challenge"]}
+    ) == 1
+
+
+@pytest.mark.parametrize("challenge_key, status_code", [("deleted_challenge", 404), ("challenge", 200)])
+def test_challenges_missing_from_the_catalog_are_read_from_the_database(seeded_app, challenge_key, status_code):
+    app = seeded_app(3)
+    server.challenge_catalog.remove(app.ids[challenge_key])
+
+    response = app.client.post("/api/solutions", headers=app.headers("admin"), json={
+        "challenge_id": app.ids[challenge_key], "content": "Solução"
+    })
+
+    assert response.status_code == status_code
+
+
+def test_duplicates_are_checked_until_the_index_can_be_built(seeded_app):
+    app = seeded_app(3)
+    portal = app.client.portal
+    solution = {key: value for key, value in app.documents["solutions"][1].items() if key != "_id"}
+    portal.call(app.database.solutions.drop_index, "challenge_id_1_user_id_1")
+    portal.call(app.database.solutions.insert_one, {**solution, "id": "duplicate", "score": None})
+    portal.call(server.ensure_indexes)
+    assert not server.submission_index_ready
+
+    assert submit(app).status_code == 200
+    assert submit(app).status_code == 400
+
+    dedup_solutions = pytest.importorskip("dedup_solutions")
+    assert portal.call(dedup_solutions.dedup, dedup_solutions.parse_args([])) == 1
+    portal.call(server.ensure_submission_index)
+    assert server.submission_index_ready
+    assert portal.call(server.db.archived_solutions.find_one, {"id": "duplicate"})["archived_reason"] == "duplicate"
@@ -0,0 +1,51 @@
+"""Read-through user profile cache."""
+
+from tests.conftest import server
+
+
+def test_repeated_profile_reads_hit_the_cache(seeded_app):
+    app = seeded_app(3)
+    headers = app.headers("student")
+
+    assert app.client.get("/api/me", headers=headers).status_code == 200
+    app.log.reset()
+    assert app.client.get("/api/me", headers=headers).status_code == 200
+
+    assert app.log.calls == []
+    stats = app.client.get("/api/admin/cache-stats", headers=app.headers("admin")).json()
+    assert stats["user_profiles"]["hits"] == 1
+    assert stats["user_profiles"]["misses"] == 1
+
+
+def test_points_increment_invalidates_cached_profile(seeded_app):
+    app = seeded_app(3)
+    headers = app.headers("student")
+    before = app.client.get("/api/me", headers=headers).json()["points"]
+
+    app.client.put(
+        "/api/solutions/evaluate",
+        json={"solution_id": app.ids["pending_solution"], "score": 70, "feedback": "Bom"},
+        headers=app.headers("admin"),
+    )
+
+    assert app.client.get("/api/me", headers=headers).json()["points"] == before + 70
+
+
+def test_cache_evicts_least_recently_used():
+    cache = server.UserProfileCache(max_size=2, ttl=60)
+    for user_id in ("a", "b", "c"):
+        token = cache._loading[user_id] = object()
+        cache._store({"id": user_id}, token)
+
+    assert cache._lookup("a") is None
+    assert cache._lookup("c") == {"id": "c"}
+
+
+def test_invalidation_discards_racing_load():
+    cache = server.UserProfileCache(max_size=2, ttl=60)
+    token = cache._loading["a"] = object()
+
+    cache.invalidate("a")
+    cache._store({"id": "a", "points": 0}, token)
+
+    assert cache._lookup("a") is None